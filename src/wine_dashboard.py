@@ -1,21 +1,190 @@
 import dash
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
 from dash.dash_table import DataTable
+from flask_caching import Cache
+from flask_compress import Compress
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
-from wine_soc_data_analysis import load_wine_data, clean_wine_data, get_data_summary
+import numpy as np
+import os
+from wine_soc_data_analysis import (
+    CACHE_DIR,
+    data_version,
+    load_clean_wine_data,
+    load_summary_totals,
+)
 
 # Load and prepare the data
 print("Loading wine data for dashboard...")
-df_raw = load_wine_data()
-df: pd.DataFrame = clean_wine_data(df_raw)
-summary = get_data_summary(df)
+df: pd.DataFrame = load_clean_wine_data()
+summary = load_summary_totals(df)
+
+# Row positions for each filter value, built once so the callback can gather
+# the selected rows instead of rescanning and copying the full frame
+wine_type_idx: dict = df.groupby("Wine_Type", observed=True).indices
+price_idx: dict = df.groupby("Price_Category", observed=True).indices
+_year_order = np.argsort(df["Purchase_Year"].to_numpy(), kind="stable")
+_sorted_years = df["Purchase_Year"].to_numpy()[_year_order]
+_NO_ROWS = np.array([], dtype=np.intp)
+
+
+def filter_positions(wine_type: str, price_range: str, year_range: tuple) -> np.ndarray:
+    """
+    Return the sorted row positions matching the dashboard filters
+    """
+    lo = np.searchsorted(_sorted_years, year_range[0], side="left")
+    hi = np.searchsorted(_sorted_years, year_range[1], side="right")
+    idx = np.sort(_year_order[lo:hi])
+    if wine_type != "All":
+        idx = np.intersect1d(idx, wine_type_idx.get(wine_type, _NO_ROWS))
+    if price_range != "All":
+        idx = np.intersect1d(idx, price_idx.get(price_range, _NO_ROWS))
+    return idx
+
+
+# Purchase price aggregates per (filter values, chart dimension), built once so
+# chart data comes from summing a small slice rather than regrouping the rows
+FILTER_COLUMNS = ["Wine_Type", "Price_Category", "Purchase_Year"]
+
+
+def build_cube(dim: str) -> pd.DataFrame:
+    """
+    Aggregate purchase price sum, count and row count for every combination of
+    the filter columns and the given chart dimension
+    """
+    keys = list(dict.fromkeys(FILTER_COLUMNS + [dim]))
+    return (
+        df.groupby(keys, observed=True, dropna=False)["Purchase price"]
+        .agg(["sum", "count", "size"])
+        .reset_index()
+    )
+
+
+timeline_cube = build_cube("Purchase date")
+wine_type_cube = build_cube("Wine_Type")
+region_cube = build_cube("Region_Code")
+vintage_cube = build_cube("Vintage")
+monthly_cube = build_cube("Purchase_Month")
+
+
+def slice_cube(
+    cube: pd.DataFrame, wine_type: str, price_range: str, year_range: tuple
+) -> pd.DataFrame:
+    """
+    Select the cube cells matching the dashboard filters
+    """
+    mask = cube["Purchase_Year"].between(year_range[0], year_range[1])
+    if wine_type != "All":
+        mask &= cube["Wine_Type"] == wine_type
+    if price_range != "All":
+        mask &= cube["Price_Category"] == price_range
+    return cube[mask]
+
+
+# Fixed £10 price bins (plus an open-ended top bin) so the price histogram is
+# binned server-side and only the bar heights are sent to the browser
+PRICE_BIN_EDGES = np.append(np.arange(0, 210, 10), np.inf)
+PRICE_BIN_LABELS = [
+    f"£{lo:.0f}-{hi:.0f}" for lo, hi in zip(PRICE_BIN_EDGES[:-2], PRICE_BIN_EDGES[1:-1])
+] + [f"£{PRICE_BIN_EDGES[-2]:.0f}+"]
+
+
+def top_counts(counts: pd.Series, k: int) -> pd.Series:
+    """
+    Return the k largest counts in descending order, partitioning first so only
+    the selected entries are sorted
+    """
+    values = counts.to_numpy()
+    if len(values) > k:
+        counts = counts.iloc[np.argpartition(-values, k - 1)[:k]]
+    return counts.sort_values(ascending=False, kind="stable")
+
+
+# Largest number of points sent to the browser for a line or scatter chart
+MAX_CHART_POINTS = 2000
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Pick n_out point positions with Largest-Triangle-Three-Buckets so the
+    downsampled series keeps the visual peaks and troughs of the original
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = x.astype(float)
+    y = y.astype(float)
+    # Bucket edges for the interior points, with the last point as a final bucket
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.intp), n)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end, next_end = edges[i], edges[i + 1], edges[i + 2]
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+# Filter options: the categorical columns already know their distinct values
+wine_types = df["Wine_Type"].cat.categories.tolist()
+price_categories = df["Price_Category"].cat.categories.tolist()
+year_min = int(df["Purchase_Year"].min())
+year_max = int(df["Purchase_Year"].max())
+mark_years = np.arange(year_min, year_max + 1, 2)
+year_marks = dict(zip(mark_years.tolist(), mark_years.astype(str).tolist()))
+
+# Dash serializes callback figures through plotly's JSON encoder; orjson encodes
+# the numpy arrays natively instead of going through Python lists
+pio.json.config.default_engine = "orjson"
+
+# Columns shown in the purchase table, which is paged on the server
+TABLE_COLUMNS = [
+    "Product name",
+    "Product code",
+    "Purchase date",
+    "Purchase price",
+    "Wine_Type",
+    "Vintage",
+    "Region_Code",
+]
+TABLE_PAGE_SIZE = 10
 
 # Initialize the Dash app
 app = dash.Dash(__name__, title="Wine Society Purchase Analysis")
 
+# WSGI entry point for multi-worker servers, e.g. gunicorn wine_dashboard:server;
+# workers share the memory-mapped cleaned data cache
+server = app.server
+
+# Compress callback responses; the table rows repeat every column name and
+# shrink several-fold under brotli or gzip
+server.config.update(COMPRESS_ALGORITHM=["br", "gzip"], COMPRESS_MIN_SIZE=512)
+Compress(server)
+
+# Memoize chart output per filter selection. Entries are keyed on the data
+# version, so charts built from older data are never served, and the cache shared
+# by all workers is left intact when another worker starts.
+DATA_VERSION = data_version()
+cache = Cache(
+    app.server,
+    config={
+        "CACHE_TYPE": "FileSystemCache",
+        "CACHE_DIR": os.path.join(CACHE_DIR, "charts"),
+        "CACHE_DEFAULT_TIMEOUT": 3600,
+    },
+)
+
 # Define the layout
 app.layout = html.Div(
     [
@@ -88,10 +257,7 @@ app.layout = html.Div(
                         html.Label("Wine Type:"),
                         dcc.Dropdown(
                             id="wine-type-filter",
-                            options=[
-                                {"label": t, "value": t}
-                                for t in sorted(df["Wine_Type"].unique())
-                            ],
+                            options=[{"label": t, "value": t} for t in wine_types],
                             value="All",
                             clearable=False,
                             style={"width": "100%"},
@@ -109,8 +275,7 @@ app.layout = html.Div(
                         dcc.Dropdown(
                             id="price-filter",
                             options=[
-                                {"label": p, "value": p}
-                                for p in sorted(df["Price_Category"].dropna().unique())
+                                {"label": p, "value": p} for p in price_categories
                             ],
                             value="All",
                             clearable=False,
@@ -128,21 +293,11 @@ app.layout = html.Div(
                         html.Label("Year Range:"),
                         dcc.RangeSlider(
                             id="year-slider",
-                            min=df["Purchase_Year"].min(),
-                            max=df["Purchase_Year"].max(),
+                            min=year_min,
+                            max=year_max,
                             step=1,
-                            marks={
-                                year: str(year)
-                                for year in range(
-                                    int(df["Purchase_Year"].min()),
-                                    int(df["Purchase_Year"].max()) + 1,
-                                    2,
-                                )
-                            },
-                            value=[
-                                df["Purchase_Year"].min(),
-                                df["Purchase_Year"].max(),
-                            ],
+                            marks=year_marks,
+                            value=[year_min, year_max],
                             tooltip={"placement": "bottom", "always_visible": True},
                         ),
                     ],
@@ -210,9 +365,11 @@ app.layout = html.Div(
                 ),
                 DataTable(
                     id="wine-table",
-                    columns=[{"name": i, "id": i} for i in df.columns],
-                    data=df.to_dict("records"),
-                    page_size=10,
+                    columns=[{"name": i, "id": i} for i in TABLE_COLUMNS],
+                    data=[],
+                    page_current=0,
+                    page_size=TABLE_PAGE_SIZE,
+                    page_action="custom",
                     style_table={"overflowX": "auto"},
                     style_cell={"textAlign": "left", "padding": "10px"},
                     style_header={
@@ -237,6 +394,168 @@ app.layout = html.Div(
 )
 
 
+def placeholder_figures(title: str, pie_label: str, timeline_title: str) -> tuple:
+    """
+    Build the six chart placeholders shown when there is nothing to plot
+    """
+    return (
+        px.scatter(title=timeline_title),
+        px.pie(values=[1], names=[pie_label], title=title),
+        go.Figure(layout_title_text=title),
+        px.bar(title=title),
+        px.scatter(title=title),
+        px.bar(title=title),
+    )
+
+
+# Placeholders are built once and returned as-is; nothing mutates them
+NO_DATA_FIGURES = placeholder_figures(
+    "No data available", "No Data", "No data available for selected filters"
+)
+ERROR_FIGURES = placeholder_figures("Error occurred", "Error", "Error occurred")
+
+
+@cache.memoize(make_name=lambda name: f"{name}:{DATA_VERSION}")
+def build_charts(wine_type: str, price_range: str, year_lo: int, year_hi: int) -> tuple:
+    """
+    Build every chart for one filter selection
+    """
+    year_range = (year_lo, year_hi)
+
+    # Filter the dataframe with a single gather over the prebuilt indexes
+    filtered_df: pd.DataFrame = df.take(
+        filter_positions(wine_type, price_range, year_range)
+    )
+
+    # Check if filtered data is empty
+    if filtered_df.empty:
+        return NO_DATA_FIGURES
+
+    filters = (wine_type, price_range, year_range)
+
+    # 1. Purchase Timeline
+    timeline_data = (
+        slice_cube(timeline_cube, *filters)
+        .groupby("Purchase date", observed=True)["sum"]
+        .sum()
+        .rename("Purchase price")
+        .reset_index()
+    )
+    timeline_data = timeline_data.iloc[
+        lttb_indices(
+            timeline_data["Purchase date"].to_numpy(dtype="int64"),
+            timeline_data["Purchase price"].to_numpy(),
+            MAX_CHART_POINTS,
+        )
+    ]
+    timeline_fig = px.line(
+        timeline_data,
+        x="Purchase date",
+        y="Purchase price",
+        title="Cumulative Spending Over Time",
+        labels={"Purchase price": "Total Spent (£)", "Purchase date": "Date"},
+        render_mode="webgl",
+    )
+    timeline_fig.update_layout(showlegend=False)
+
+    # 2. Wine Type Distribution
+    wine_type_counts = (
+        slice_cube(wine_type_cube, *filters)
+        .groupby("Wine_Type", observed=True)["size"]
+        .sum()
+        .sort_values(ascending=False, kind="stable")
+    )
+    if len(wine_type_counts) > 0:
+        pie_fig = px.pie(
+            values=wine_type_counts.values,
+            names=wine_type_counts.index,
+            title="Distribution by Wine Type",
+        )
+    else:
+        pie_fig = px.pie(values=[1], names=["No Data"], title="No Wine Types Available")
+
+    # 3. Price Distribution
+    prices = filtered_df["Purchase price"].dropna().to_numpy(dtype=float)
+    price_counts, _ = np.histogram(prices, bins=PRICE_BIN_EDGES)
+    price_fig = go.Figure(go.Bar(x=PRICE_BIN_LABELS, y=price_counts))
+    price_fig.update_layout(
+        title="Price Distribution",
+        xaxis_title="Price (£)",
+        yaxis_title="Number of Purchases",
+        showlegend=False,
+    )
+
+    # 4. Regional Analysis
+    region_data = (
+        slice_cube(region_cube, *filters)
+        .groupby("Region_Code", observed=True)["size"]
+        .sum()
+        .pipe(top_counts, 10)
+    )
+    if len(region_data) > 0:
+        region_fig = px.bar(
+            x=region_data.index,
+            y=region_data.values,
+            title="Top 10 Wine Regions",
+            labels={"x": "Region Code", "y": "Number of Purchases"},
+        )
+    else:
+        region_fig = px.bar(title="No Regional Data Available")
+    region_fig.update_layout(showlegend=False)
+
+    # 5. Vintage Analysis
+    vintage_totals = (
+        slice_cube(vintage_cube, *filters)
+        .groupby("Vintage", observed=True)[["sum", "count"]]
+        .sum()
+    )
+    if len(vintage_totals) > 0:
+        vintage_data = vintage_totals["sum"] / vintage_totals["count"]
+        vintage_data = vintage_data.iloc[
+            lttb_indices(
+                vintage_data.index.to_numpy(dtype="int64"),
+                vintage_data.to_numpy(dtype=float),
+                MAX_CHART_POINTS,
+            )
+        ]
+        vintage_fig = px.scatter(
+            x=vintage_data.index,
+            y=vintage_data.values,
+            title="Average Price by Vintage",
+            labels={"x": "Vintage", "y": "Average Price (£)"},
+            render_mode="webgl",
+        )
+    else:
+        vintage_fig = px.scatter(title="No Vintage Data Available")
+    vintage_fig.update_layout(showlegend=False)
+
+    # 6. Monthly Pattern
+    monthly_data = (
+        slice_cube(monthly_cube, *filters)
+        .groupby("Purchase_Month", observed=True)["sum"]
+        .sum()
+    )
+    if len(monthly_data) > 0:
+        monthly_fig = px.bar(
+            x=monthly_data.index,
+            y=monthly_data.values,
+            title="Total Spending by Month",
+            labels={"x": "Month", "y": "Total Spent (£)"},
+        )
+    else:
+        monthly_fig = px.bar(title="No Monthly Data Available")
+    monthly_fig.update_layout(showlegend=False)
+
+    return (
+        timeline_fig,
+        pie_fig,
+        price_fig,
+        region_fig,
+        vintage_fig,
+        monthly_fig,
+    )
+
+
 # Callback to filter data
 @app.callback(
     [
@@ -246,7 +565,6 @@ app.layout = html.Div(
         Output("regional-analysis", "figure"),
         Output("vintage-analysis", "figure"),
         Output("monthly-pattern", "figure"),
-        Output("wine-table", "data"),
     ],
     [
         Input("wine-type-filter", "value"),
@@ -255,167 +573,55 @@ app.layout = html.Div(
     ],
 )
 def update_charts(wine_type: str, price_range: str, year_range: tuple) -> tuple:
+    # Errors are handled here, outside the memoized build, so a failed build
+    # is not cached for the selection
     try:
-        # Filter the dataframe
-        filtered_df: pd.DataFrame = df.copy()
-
-        if wine_type != "All":
-            filtered_df = pd.DataFrame(
-                filtered_df[filtered_df["Wine_Type"] == wine_type]
-            )
-
-        if price_range != "All":
-            filtered_df = pd.DataFrame(
-                filtered_df[filtered_df["Price_Category"] == price_range]
-            )
-
-        filtered_df = pd.DataFrame(
-            filtered_df[
-                (filtered_df["Purchase_Year"] >= year_range[0])
-                & (filtered_df["Purchase_Year"] <= year_range[1])
-            ]
+        charts: tuple = build_charts(
+            wine_type, price_range, year_range[0], year_range[1]
         )
+    except (KeyError, ValueError) as e:
+        print(f"Error in update_charts: {e}")
+        return ERROR_FIGURES
+    return charts
 
-        # Check if filtered data is empty
-        if filtered_df.empty:
-            # Return empty figures
-            empty_fig = px.scatter(title="No data available for selected filters")
-            empty_pie = px.pie(values=[1], names=["No Data"], title="No data available")
-            empty_hist = px.histogram(title="No data available")
-            empty_bar = px.bar(title="No data available")
-            empty_scatter = px.scatter(title="No data available")
-            empty_monthly = px.bar(title="No data available")
-
-            return (
-                empty_fig,
-                empty_pie,
-                empty_hist,
-                empty_bar,
-                empty_scatter,
-                empty_monthly,
-                [],
-            )
 
-        # 1. Purchase Timeline
-        timeline_data = (
-            filtered_df.groupby("Purchase date")["Purchase price"].sum().reset_index()
-        )
-        timeline_fig = px.line(
-            timeline_data,
-            x="Purchase date",
-            y="Purchase price",
-            title="Cumulative Spending Over Time",
-            labels={"Purchase price": "Total Spent (£)", "Purchase date": "Date"},
-        )
-        timeline_fig.update_layout(showlegend=False)
-
-        # 2. Wine Type Distribution
-        wine_type_counts = filtered_df["Wine_Type"].value_counts()
-        if len(wine_type_counts) > 0:
-            pie_fig = px.pie(
-                values=wine_type_counts.values,
-                names=wine_type_counts.index,
-                title="Distribution by Wine Type",
-            )
-        else:
-            pie_fig = px.pie(
-                values=[1], names=["No Data"], title="No Wine Types Available"
-            )
+def table_page(
+    positions: np.ndarray, page_current: int, page_size: int
+) -> tuple[list, int]:
+    """
+    Rows of the requested table page and the total page count; only the rows on
+    the page are gathered and serialized
+    """
+    page_count = max(1, -(-len(positions) // page_size))
+    start = min(page_current or 0, page_count - 1) * page_size
+    end = start + page_size
+    rows = df.take(positions[start:end])[TABLE_COLUMNS]
+    return rows.to_dict("records"), page_count
 
-        # 3. Price Distribution
-        price_fig = px.histogram(
-            filtered_df,
-            x="Purchase price",
-            nbins=20,
-            title="Price Distribution",
-            labels={"Purchase price": "Price (£)", "count": "Number of Purchases"},
-        )
-        price_fig.update_layout(showlegend=False)
-
-        # 4. Regional Analysis
-        region_data = filtered_df["Region_Code"].value_counts().head(10)
-        if len(region_data) > 0:
-            region_fig = px.bar(
-                x=region_data.index,
-                y=region_data.values,
-                title="Top 10 Wine Regions",
-                labels={"x": "Region Code", "y": "Number of Purchases"},
-            )
-        else:
-            region_fig = px.bar(title="No Regional Data Available")
-        region_fig.update_layout(showlegend=False)
-
-        # 5. Vintage Analysis
-        vintage_filtered = filtered_df[filtered_df["Vintage"].notna()]
-        if len(vintage_filtered) > 0:
-            vintage_data = vintage_filtered.groupby("Vintage")["Purchase price"].mean()
-            vintage_fig = px.scatter(
-                x=vintage_data.index,
-                y=vintage_data.values,
-                title="Average Price by Vintage",
-                labels={"x": "Vintage", "y": "Average Price (£)"},
-            )
-        else:
-            vintage_fig = px.scatter(title="No Vintage Data Available")
-        vintage_fig.update_layout(showlegend=False)
-
-        # 6. Monthly Pattern
-        monthly_data = filtered_df.groupby("Purchase_Month")["Purchase price"].sum()
-        if len(monthly_data) > 0:
-            monthly_fig = px.bar(
-                x=monthly_data.index,
-                y=monthly_data.values,
-                title="Total Spending by Month",
-                labels={"x": "Month", "y": "Total Spent (£)"},
-            )
-        else:
-            monthly_fig = px.bar(title="No Monthly Data Available")
-        monthly_fig.update_layout(showlegend=False)
-
-        # 7. Table data
-        table_data = pd.DataFrame(
-            filtered_df[
-                [
-                    "Product name",
-                    "Product code",
-                    "Purchase date",
-                    "Purchase price",
-                    "Wine_Type",
-                    "Vintage",
-                    "Region_Code",
-                ]
-            ]
-        ).to_dict("records")
-
-        return (
-            timeline_fig,
-            pie_fig,
-            price_fig,
-            region_fig,
-            vintage_fig,
-            monthly_fig,
-            table_data,
-        )
 
-    except Exception as e:
-        print(f"Error in update_charts: {e}")
-        # Return empty figures on error
-        empty_fig = px.scatter(title="Error occurred")
-        empty_pie = px.pie(values=[1], names=["Error"], title="Error occurred")
-        empty_hist = px.histogram(title="Error occurred")
-        empty_bar = px.bar(title="Error occurred")
-        empty_scatter = px.scatter(title="Error occurred")
-        empty_monthly = px.bar(title="Error occurred")
-
-        return (
-            empty_fig,
-            empty_pie,
-            empty_hist,
-            empty_bar,
-            empty_scatter,
-            empty_monthly,
-            [],
-        )
+# Callback to page through the filtered rows
+@app.callback(
+    [
+        Output("wine-table", "data"),
+        Output("wine-table", "page_count"),
+    ],
+    [
+        Input("wine-type-filter", "value"),
+        Input("price-filter", "value"),
+        Input("year-slider", "value"),
+        Input("wine-table", "page_current"),
+    ],
+    State("wine-table", "page_size"),
+)
+def update_table(
+    wine_type: str,
+    price_range: str,
+    year_range: tuple,
+    page_current: int,
+    page_size: int,
+) -> tuple[list, int]:
+    positions = filter_positions(wine_type, price_range, year_range)
+    return table_page(positions, page_current, page_size)
 
 
 # Add custom CSS
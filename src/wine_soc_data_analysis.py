@@ -1,6 +1,9 @@
 import pandas as pd
-import re
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pacsv
 import os
+import json
 
 # File paths
 CSV_FILE = os.path.join(
@@ -11,13 +14,53 @@ CSV_FILE = os.path.join(
     "TWS_Members_Wines_CSV_638865531904137428.csv",
 )
 
+# Cleaned data cache, keyed on the source CSV's mtime and size
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "Data", "WineSociety", "cache"
+)
+CACHE_FILE = os.path.join(CACHE_DIR, "wine_data_clean.arrow")
+CACHE_META_FILE = os.path.join(CACHE_DIR, "wine_data_clean.json")
+
+# Bump whenever clean_wine_data changes its output so stale caches are rebuilt
+CACHE_VERSION = 8
+
+# Set to any non-empty value to ignore the cache and rebuild it from the CSV
+REFRESH_CACHE_ENV = "WINE_DATA_REFRESH"
+
+# Purchase price bands: each label covers (lower edge, next edge], the last is open
+PRICE_CATEGORY_EDGES = np.array([0, 10, 20, 50, 100], dtype=float)
+PRICE_CATEGORY_LABELS = ["Under £10", "£10-20", "£20-50", "£50-100", "Over £100"]
+
+# Column types for the CSV export, so the parser does not have to infer them
+CSV_COLUMN_TYPES = {
+    "Product name": pa.string(),
+    "Product code": pa.string(),
+    "Purchase date": pa.string(),
+    "Purchase price": pa.float64(),
+    "Drink date": pa.string(),
+}
+
+# The Arrow cache cannot tell pandas which string dtype a column, or a
+# category's values, had: plain string columns are read back as Arrow strings,
+# as load_wine_data reads them, and these categorical columns get back the
+# Arrow string categories clean_wine_data builds them with
+ARROW_STRING = pd.ArrowDtype(pa.string())
+ARROW_STRING_CATEGORY_COLUMNS = ["Product code", "Region_Code"]
+
 
 def load_wine_data() -> pd.DataFrame:
     """
     Load the Wine Society CSV data with headers on the second line
     """
     # Read the CSV file, skipping the first line (download date) and using the second line as headers
-    df = pd.read_csv(CSV_FILE, skiprows=1)
+    table = pacsv.read_csv(
+        CSV_FILE,
+        read_options=pacsv.ReadOptions(skip_rows=1),
+        convert_options=pacsv.ConvertOptions(
+            column_types=CSV_COLUMN_TYPES, strings_can_be_null=True
+        ),
+    )
+    df = table.to_pandas(types_mapper=pd.ArrowDtype)
 
     print(f"Loaded {len(df)} wine purchases")
     print(f"Columns: {list(df.columns)}")
@@ -29,32 +72,35 @@ def clean_wine_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Clean and prepare the wine data for analysis
     """
-    # Create a copy to avoid modifying the original
-    df_clean: pd.DataFrame = df.copy()
-
-    # Clean product names - remove empty entries
-    df_clean = pd.DataFrame(
-        df_clean[df_clean["Product name"].notna() & (df_clean["Product name"] != "")]
-    )
+    # Clean product names - remove empty entries (boolean indexing already copies)
+    df_clean = df[df["Product name"].notna() & (df["Product name"] != "")]
 
     # Convert purchase date to datetime
-    df_clean["Purchase date"] = pd.to_datetime(
+    purchase_date = pd.to_datetime(
         df_clean["Purchase date"], format="%m/%d/%Y", errors="coerce"
     )
 
     # Convert purchase price to numeric, removing any currency symbols
-    df_clean["Purchase price"] = pd.to_numeric(
-        df_clean["Purchase price"], errors="coerce"
+    purchase_price = pd.to_numeric(df_clean["Purchase price"], errors="coerce")
+
+    # Extract year from product names for vintage analysis; on the Arrow string
+    # column this runs Arrow's RE2 kernel, which needs a named group
+    vintage = (
+        df_clean["Product name"]
+        .astype(pd.ArrowDtype(pa.string()))
+        .str.extract(r"(?P<vintage>\d{4})", expand=False)
+        .astype("Int16")
     )
 
-    # Extract year from product names for vintage analysis
-    df_clean["Vintage"] = (
-        df_clean["Product name"].astype(str).str.extract(r"(\d{4})").astype(float)
+    # Extract wine region/country from product codes, slicing with Arrow's string
+    # kernel rather than building a Python str per row
+    region_codes = (
+        df_clean["Product code"]
+        .astype(pd.ArrowDtype(pa.string()))
+        .str.slice(0, 2)
+        .astype("category")
     )
 
-    # Extract wine region/country from product codes
-    df_clean["Region_Code"] = df_clean["Product code"].astype(str).str[:2]
-
     # Create wine type categories based on product codes
     wine_type_mapping = {
         "RH": "Rhône",
@@ -95,36 +141,91 @@ def clean_wine_data(df: pd.DataFrame) -> pd.DataFrame:
         "LC": "Mixed Cases",
     }
 
-    df_clean["Wine_Type"] = (
-        df_clean["Region_Code"].replace(wine_type_mapping).fillna("Other")
+    # Map each distinct region code once, then gather by category code. Unknown
+    # codes keep their own name; the trailing "Other" is picked up by the -1
+    # code that missing region codes get.
+    wine_type_lut = np.array(
+        [wine_type_mapping.get(code, code) for code in region_codes.cat.categories]
+        + ["Other"],
+        dtype=object,
     )
-
-    # Create price categories
-    df_clean["Price_Category"] = pd.cut(
-        df_clean["Purchase price"],
-        bins=[0, 10, 20, 50, 100, float("inf")],
-        labels=["Under £10", "£10-20", "£20-50", "£50-100", "Over £100"],
+    wine_type = pd.Categorical(wine_type_lut[region_codes.cat.codes.to_numpy()])
+
+    # Create price categories: bins are right-closed like pd.cut, and prices
+    # that are missing or not above zero fall outside every bin
+    prices = purchase_price.to_numpy(dtype=float, na_value=np.nan)
+    price_codes = np.digitize(prices, PRICE_CATEGORY_EDGES, right=True) - 1
+    price_codes[np.isnan(prices)] = -1
+    price_category = pd.Categorical.from_codes(
+        price_codes.astype(np.int8), categories=PRICE_CATEGORY_LABELS, ordered=True
     )
 
-    # Extract month and year for time series analysis
-    df_clean["Purchase_Year"] = df_clean["Purchase date"].dt.year
-    df_clean["Purchase_Month"] = df_clean["Purchase date"].dt.month
-    df_clean["Purchase_Quarter"] = df_clean["Purchase date"].dt.quarter
+    # Clean drink date - take the start year from ranges like "2017 - 2021";
+    # blanks, "0 - 0" and single years have no range and are left empty
+    drink_start = (
+        df_clean["Drink date"]
+        .astype("string")
+        .str.extract(r"(\d{4}).*?\d{4}", expand=False)
+    )
 
-    # Clean drink date - extract years if present
-    def extract_drink_years(drink_date: str) -> int | None:
-        if pd.isna(drink_date) or drink_date == "" or drink_date == "0 - 0":
-            return None
-        # Extract years from format like "2017 - 2021" or "2020 - 2023"
-        years = re.findall(r"\d{4}", str(drink_date))
-        if len(years) >= 2:
-            return int(years[0])  # Return start year
-        return None
+    # Derive year, month and quarter for the time series analysis from a single
+    # month-resolution view of the dates; missing dates stay missing
+    purchase_months = purchase_date.to_numpy().astype("datetime64[M]")
+    missing_date = np.isnat(purchase_months)
+    months_since_epoch = purchase_months.astype(np.int64)
+    month_number = months_since_epoch % 12 + 1
+    purchase_year = pd.Series(
+        pd.arrays.IntegerArray(
+            (months_since_epoch // 12 + 1970).astype(np.int16), missing_date
+        ),
+        index=df_clean.index,
+    )
+    purchase_month = pd.arrays.IntegerArray(
+        month_number.astype(np.int8), missing_date.copy()
+    )
+    purchase_quarter = pd.arrays.IntegerArray(
+        ((month_number - 1) // 3 + 1).astype(np.int8), missing_date.copy()
+    )
 
-    df_clean["Drink_Start_Year"] = df_clean["Drink date"].apply(extract_drink_years)
+    # Add every derived column in one pass; the age of the wine at purchase
+    # comes from year and vintage
+    df_clean = df_clean.assign(
+        **{
+            "Purchase date": purchase_date,
+            "Purchase price": purchase_price,
+            "Vintage": vintage,
+            "Region_Code": region_codes,
+            "Wine_Type": wine_type,
+            "Price_Category": price_category,
+            "Purchase_Year": purchase_year,
+            "Purchase_Month": purchase_month,
+            "Purchase_Quarter": purchase_quarter,
+            "Drink_Start_Year": pd.to_numeric(drink_start).astype("Int32"),
+            "Wine_Age_At_Purchase": purchase_year - vintage,
+        }
+    )
 
-    # Calculate age of wine at purchase
-    df_clean["Wine_Age_At_Purchase"] = df_clean["Purchase_Year"] - df_clean["Vintage"]
+    # Downcast to compact dtypes so repeated scans touch fewer bytes
+    memory_before = df_clean.memory_usage(deep=True).sum()
+    df_clean = df_clean.astype(
+        {
+            "Purchase_Year": "Int16",
+            "Purchase_Month": "Int8",
+            "Purchase_Quarter": "Int8",
+            "Vintage": "Int16",
+            "Wine_Age_At_Purchase": "Int16",
+            "Drink_Start_Year": "Int16",
+            "Product code": "category",
+            "Region_Code": "category",
+            "Wine_Type": "category",
+            "Price_Category": "category",
+        }
+    )
+    memory_after = df_clean.memory_usage(deep=True).sum()
+    print(
+        f"Memory usage: {memory_before / 1024:,.1f} KiB -> "
+        f"{memory_after / 1024:,.1f} KiB"
+    )
 
     print(f"Cleaned data shape: {df_clean.shape}")
     print(f"Data types:\n{df_clean.dtypes}")
@@ -132,16 +233,152 @@ def clean_wine_data(df: pd.DataFrame) -> pd.DataFrame:
     return df_clean
 
 
-def get_data_summary(df: pd.DataFrame) -> dict:
+def _csv_signature() -> dict:
     """
-    Generate summary statistics for the wine data
+    Identify the current source CSV by modification time and size
     """
-    summary = {
+    stat = os.stat(CSV_FILE)
+    return {
+        "cache_version": CACHE_VERSION,
+        "csv_mtime_ns": stat.st_mtime_ns,
+        "csv_size": stat.st_size,
+    }
+
+
+def data_version() -> str:
+    """
+    Version of the cleaned data: changes whenever the source CSV or the
+    cleaning (CACHE_VERSION) does, so caches built from the data can key on it
+    """
+    signature = _csv_signature()
+    return (
+        f"{signature['cache_version']}-{signature['csv_mtime_ns']}"
+        f"-{signature['csv_size']}"
+    )
+
+
+def _read_cache_meta() -> dict | None:
+    try:
+        with open(CACHE_META_FILE, encoding="utf-8") as f:
+            meta: dict = json.load(f)
+        return meta
+    except (OSError, ValueError):
+        return None
+
+
+def _cache_is_fresh(signature: dict, meta: dict | None) -> bool:
+    if os.getenv(REFRESH_CACHE_ENV):
+        return False
+    if meta is None or not os.path.exists(CACHE_FILE):
+        return False
+    return all(meta.get(key) == value for key, value in signature.items())
+
+
+def summary_totals(df: pd.DataFrame) -> dict:
+    """
+    Headline figures shown on the dashboard summary cards
+    """
+    return {
         "total_purchases": len(df),
         "total_spent": df["Purchase price"].sum(),
         "avg_price": df["Purchase price"].mean(),
-        "price_range": (df["Purchase price"].min(), df["Purchase price"].max()),
         "date_range": (df["Purchase date"].min(), df["Purchase date"].max()),
+    }
+
+
+def write_cleaned_cache(df_clean: pd.DataFrame, signature: dict) -> None:
+    """
+    Persist the cleaned data as an uncompressed Arrow IPC file alongside a JSON
+    sidecar holding the signature of the CSV it was built from and the summary
+    card figures
+    """
+    totals = summary_totals(df_clean)
+    meta = {
+        **signature,
+        "summary": {
+            "total_purchases": totals["total_purchases"],
+            "total_spent": float(totals["total_spent"]),
+            "avg_price": float(totals["avg_price"]),
+            "date_range": [str(d) for d in totals["date_range"]],
+        },
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temporary file and swap it in, so a worker process never
+        # maps a half-written cache
+        table = pa.Table.from_pandas(df_clean)
+        tmp_file = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_file, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_file, CACHE_FILE)
+        with open(CACHE_META_FILE, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+    except Exception as e:
+        print(f"Could not write cleaned data cache: {e}")
+
+
+def load_summary_totals(df_clean: pd.DataFrame) -> dict:
+    """
+    Summary card figures for the frame returned by load_clean_wine_data, read
+    from the cache sidecar when it is current and computed otherwise
+    """
+    meta = _read_cache_meta()
+    if _cache_is_fresh(_csv_signature(), meta) and meta and "summary" in meta:
+        totals: dict = meta["summary"]
+        totals["date_range"] = tuple(pd.Timestamp(d) for d in totals["date_range"])
+        return totals
+    return summary_totals(df_clean)
+
+
+def read_cleaned_cache() -> pd.DataFrame:
+    """
+    Read the cleaned data back from the Arrow cache with the same dtypes that
+    clean_wine_data gave it
+    """
+    with pa.memory_map(CACHE_FILE) as source:
+        df_clean = (
+            pa.ipc.open_file(source)
+            .read_all()
+            .to_pandas(types_mapper={pa.string(): ARROW_STRING}.get)
+        )
+    for column in ARROW_STRING_CATEGORY_COLUMNS:
+        dtype = df_clean[column].dtype
+        df_clean[column] = df_clean[column].astype(
+            pd.CategoricalDtype(
+                dtype.categories.astype(ARROW_STRING), ordered=dtype.ordered
+            )
+        )
+    return df_clean
+
+
+def load_clean_wine_data() -> pd.DataFrame:
+    """
+    Load the cleaned wine data, reusing the Arrow cache when the source CSV is
+    unchanged and rebuilding it otherwise. The cache is memory-mapped, so every
+    dashboard worker reading it shares the same pages of the OS file cache
+    """
+    signature = _csv_signature()
+    if _cache_is_fresh(signature, _read_cache_meta()):
+        try:
+            df_clean = read_cleaned_cache()
+            print(f"Loaded {len(df_clean)} cleaned wine purchases from cache")
+            return df_clean
+        except Exception as e:
+            print(f"Could not read cleaned data cache, rebuilding: {e}")
+
+    df_clean = clean_wine_data(load_wine_data())
+    write_cleaned_cache(df_clean, signature)
+    return df_clean
+
+
+def get_data_summary(df: pd.DataFrame) -> dict:
+    """
+    Generate summary statistics for the wine data
+    """
+    summary = {
+        **summary_totals(df),
+        "price_range": (df["Purchase price"].min(), df["Purchase price"].max()),
         "wine_types": df["Wine_Type"].value_counts().to_dict(),
         "price_categories": df["Price_Category"].value_counts().to_dict(),
         "regions": df["Region_Code"].value_counts().head(10).to_dict(),
@@ -157,11 +394,8 @@ def main() -> pd.DataFrame:
     """
     print("Loading Wine Society purchase data...")
 
-    # Load the data
-    df_raw = load_wine_data()
-
-    # Clean and prepare the data
-    df_clean = clean_wine_data(df_raw)
+    # Load and clean the data, reusing the cache when the CSV is unchanged
+    df_clean = load_clean_wine_data()
 
     # Generate summary
     summary = get_data_summary(df_clean)
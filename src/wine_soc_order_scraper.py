@@ -1,15 +1,116 @@
 import requests
+import requests_cache
+from requests_cache import DO_NOT_CACHE
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from typing import List
-import bs4
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Iterator, List
+from urllib.parse import urljoin
+import dbm
+import os
+import re
+import shelve
+import threading
+import time
 
 # TODO: If login or JavaScript is required, switch to Selenium
 
+# Order detail pages fetched at once; kept small to stay polite to the site
+MAX_WORKERS = 8
+
+# Scraped pages are cached on disk so repeat runs skip the network
+HTTP_CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "Data",
+    "WineSociety",
+    "cache",
+    "http_cache.sqlite",
+)
+HTTP_CACHE_EXPIRY = timedelta(days=7)
+
+# Order pages that answered with a terminal status are remembered for a day and
+# skipped instead of being requested again
+DEAD_URL_CACHE_FILE = os.path.join(os.path.dirname(HTTP_CACHE_FILE), "dead_urls")
+DEAD_URL_STATUSES = {404, 410, 451}
+DEAD_URL_EXPIRY = timedelta(hours=24)
+
+# Transient failures are retried with exponential backoff plus jitter, so
+# concurrent workers do not retry in lockstep; Retry-After is honoured
+RETRY_POLICY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    backoff_jitter=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"],
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
 
 class WineSocietyOrderScraper:
-    def __init__(self, start_url: str, session: "requests.Session | None" = None):
+    def __init__(
+        self,
+        start_url: str,
+        session: "requests.Session | None" = None,
+        max_workers: int = MAX_WORKERS,
+    ):
         self.start_url = start_url
-        self.session = session or requests.Session()
+        self.max_workers = max_workers
+        if session is None:
+            # Pool enough keep-alive connections for every worker thread, blocking
+            # rather than opening throwaway extra sockets, and retry transient
+            # failures. Only the order detail pages are cached: the orders page
+            # itself is always fetched, so new orders are never missed
+            session = requests_cache.CachedSession(
+                HTTP_CACHE_FILE,
+                backend="sqlite",
+                expire_after=HTTP_CACHE_EXPIRY,
+                urls_expire_after={
+                    re.compile(f"^{re.escape(start_url)}$"): DO_NOT_CACHE
+                },
+                allowable_methods=("GET",),
+                stale_if_error=True,
+                cache_control=True,
+                match_headers=["Accept", "Accept-Language"],
+            )
+            adapter = HTTPAdapter(
+                pool_connections=max_workers,
+                pool_maxsize=max_workers,
+                pool_block=True,
+                max_retries=RETRY_POLICY,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        # Caps concurrent requests to the site, however many threads call in
+        self._request_slots = threading.Semaphore(max_workers)
+        # shelve is not safe for concurrent access, so worker threads take turns
+        self._dead_urls_lock = threading.Lock()
+
+    def _dead_url_status(self, url: str) -> int | None:
+        """
+        Status code an order URL last failed with, if that is still current
+        """
+        with self._dead_urls_lock:
+            try:
+                with shelve.open(DEAD_URL_CACHE_FILE, flag="r") as dead_urls:
+                    entry = dead_urls.get(url)
+            except dbm.error:
+                # Nothing has been recorded yet
+                return None
+        if entry is None or entry["expires"] < time.time():
+            return None
+        status: int = entry["status"]
+        return status
+
+    def _remember_dead_url(self, url: str, status: int) -> None:
+        expires = time.time() + DEAD_URL_EXPIRY.total_seconds()
+        with self._dead_urls_lock:
+            os.makedirs(os.path.dirname(DEAD_URL_CACHE_FILE), exist_ok=True)
+            with shelve.open(DEAD_URL_CACHE_FILE) as dead_urls:
+                dead_urls[url] = {"status": status, "expires": expires}
 
     def login(self, username: str, password: str) -> None:
         """
@@ -24,55 +125,59 @@ class WineSocietyOrderScraper:
         """
         resp = self.session.get(self.start_url)
         resp.raise_for_status()
-        return BeautifulSoup(resp.text, "html.parser")
+        return BeautifulSoup(resp.text, "lxml")
 
     def find_order_links(self, soup: BeautifulSoup) -> List[str]:
         """
-        Find all 'View' buttons/links for orders on the page.
-        Handles both <a> and <button> elements with the text 'View'.
-        If <a>, extracts href. If <button>, notes that Selenium is needed.
+        Find all 'View' links for orders on the page, as absolute URLs.
+        'View' <button> elements cannot be followed without a browser, so they
+        are only counted and reported.
         """
         order_links: List[str] = []
-        # Find <a> tags with text 'View'
-        for a in soup.find_all("a", string="View"):
-            if isinstance(a, bs4.element.Tag):
-                href = a.get("href")
-                if isinstance(href, str):
-                    order_links.append(href)
-        # Find <button> tags with text 'View' (static scraping cannot follow these)
-        for btn in soup.find_all("button", string="View"):
-            if isinstance(btn, bs4.element.Tag):
-                # NOTE: Static scraping cannot follow button clicks; Selenium is needed for this
-                order_links.append("[BUTTON: Selenium required]")
+        buttons = 0
+        # One selector pass over the links with an href and the buttons
+        for tag in soup.select("a[href], button"):
+            if tag.get_text(strip=True) != "View":
+                continue
+            if tag.name == "button":
+                buttons += 1
+            else:
+                order_links.append(urljoin(self.start_url, str(tag["href"])))
+        if buttons:
+            # NOTE: Static scraping cannot follow button clicks; Selenium is needed for this
+            print(f"Skipped {buttons} 'View' buttons: Selenium required.")
         return order_links
 
     def scrape_order_detail(self, order_url: str) -> dict:
         """
         Scrape data from an individual order detail page.
+        Pages that are gone (404, 410, 451) give a record with the status
+        instead of data, and are not requested again until the entry expires.
         Placeholder for now; update with actual scraping logic.
         """
-        resp = self.session.get(order_url)
+        status = self._dead_url_status(order_url)
+        if status is not None:
+            return {"url": order_url, "data": None, "status": status}
+        with self._request_slots:
+            resp = self.session.get(order_url)
+        if resp.status_code in DEAD_URL_STATUSES:
+            self._remember_dead_url(order_url, resp.status_code)
+            return {"url": order_url, "data": None, "status": resp.status_code}
         resp.raise_for_status()
         # TODO: Extract relevant data from the order detail page
         return {"url": order_url, "data": "TODO: extract order data"}
 
-    def scrape_all_orders(self) -> List[dict]:
+    def scrape_all_orders(self) -> Iterator[dict]:
         """
         Main method to scrape all orders from the orders page.
+        Order detail pages are fetched concurrently; results are yielded in page
+        order as they complete.
         """
         soup = self.get_orders_page()
-        order_links = self.find_order_links(soup)
-        print(f"Found {len(order_links)} orders.")
-        orders = []
-        for link in order_links:
-            # If links are relative, prepend domain
-            if link.startswith("/"):
-                from urllib.parse import urljoin
-
-                link = urljoin(self.start_url, link)
-            order_data = self.scrape_order_detail(link)
-            orders.append(order_data)
-        return orders
+        order_urls = self.find_order_links(soup)
+        print(f"Found {len(order_urls)} orders.")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            yield from executor.map(self.scrape_order_detail, order_urls)
 
 
 def main() -> None:
@@ -80,8 +185,7 @@ def main() -> None:
     start_url = "https://www.thewinesociety.com/my-account/orders"  # TODO: Replace with actual start link
     scraper = WineSocietyOrderScraper(start_url)
     # scraper.login('username', 'password')  # Uncomment and implement if needed
-    orders = scraper.scrape_all_orders()
-    for order in orders:
+    for order in scraper.scrape_all_orders():
         print(order)
 
 
@@ -6,8 +6,19 @@ import os
 import time
 import base64
 import logging
-from dataclasses import dataclass, asdict
-from typing import Optional, List, Any
+import shutil
+import tempfile
+import threading
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, List, Any, Iterator, Callable, Final, Literal, Union
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -15,7 +26,12 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import re
+import json
 from glob import glob
+from urllib.parse import urljoin
+import lxml.html
+from lxml import etree
+import requests
 
 # Set up logging
 logging.basicConfig(
@@ -25,8 +41,407 @@ logging.basicConfig(
 )
 log = logging.getLogger("wine_soc_scraper")
 
+# Browsers working through order detail pages at once; kept small to respect
+# the site's rate limits
+MAX_BROWSERS = 4
+
+# Order detail pages fetched at once over plain HTTP, before any browser is used
+HTTP_WORKERS = 16
+
+# Order detail tabs each browser keeps loading, so their pages load while
+# another one is being scraped; a browser is handed ORDER_BATCH orders at a time
+ORDER_TABS = 4
+ORDER_BATCH = ORDER_TABS * 4
+OPEN_TABS_JS = "for (const url of arguments[0]) { window.open(url, '_blank'); }"
+
+# Receipt and wine notes PDFs fetched at once over HTTP
+DOWNLOAD_WORKERS = 8
+
+# Chrome saves browser downloads here before they are moved into place
+DOWNLOAD_DIR = "Data"
+
+# Chrome profile kept between runs for the main browser, so a login (and the
+# cookie consent) can carry over to the next run
+CHROME_PROFILE_DIR = os.path.join("Data", "chrome_profile")
+
+# Scraped orders are appended here one JSON object per line as they complete
+ORDERS_FILE = os.path.join("Data", "orders.jsonl")
+
+# Longest wait for a browser download to finish, and how often to check on it
+DOWNLOAD_TIMEOUT = 15.0
+DOWNLOAD_POLL = 0.25
+
+# Page.printToPDF settings: A4 paper, returned as a stream read in chunks
+# rather than one base64 string
+PRINT_TO_PDF_OPTIONS = {
+    "printBackground": True,
+    "preferCSSPageSize": True,
+    "paperWidth": 8.27,
+    "paperHeight": 11.69,
+    "transferMode": "ReturnAsStream",
+}
+PDF_CHUNK_SIZE = 1 << 20
+
+# Image and web font requests the browser drops, keeping pages and printed PDFs
+# small; stylesheets still load, as the saved order PDFs are printed from the page
+RESOURCE_URL_PATTERNS = [
+    "*.jpg",
+    "*.jpeg",
+    "*.png",
+    "*.webp",
+    "*.gif",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+]
+# Analytics, tag manager and ad scripts the scraper has no use for. The OneTrust
+# cookie banner is left alone, as the scraper accepts it before reading pages
+TRACKER_URL_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*segment.io*",
+    "*segment.com*",
+    "*facebook.net*",
+    "*hotjar.com*",
+]
+BLOCKED_URL_PATTERNS = RESOURCE_URL_PATTERNS + TRACKER_URL_PATTERNS
+
+# Cookie the OneTrust banner sets once its choice has been made
+COOKIE_CONSENT_COOKIE = "OptanonAlertBoxClosed"
+
+# Explicit waits check every WAIT_POLL seconds rather than Selenium's default
+# half second; no implicit wait is set, so these timeouts are the real ones
+WAIT_TIMEOUT = 20
+WAIT_POLL = 0.1
+
+# Site root; a browser must be on the site's domain before cookies can be set
+SITE_URL = "https://www.thewinesociety.com/"
+
+# Order history page, which is also where login starts
+ORDER_HISTORY_URL: Final[str] = (
+    "https://www.thewinesociety.com/my-account/order-history/?page=1&months=19"
+    "&epmonths=6&isEnPrimeur=False"
+)
+
+# Login form fields (by name) and the OneTrust cookie banner's accept button (by id)
+LOGIN_USERNAME_NAME: Final[str] = "SubmissionModel.Username"
+LOGIN_PASSWORD_NAME: Final[str] = "SubmissionModel.Password"
+COOKIE_BANNER_ID: Final[str] = "onetrust-accept-btn-handler"
+
+# XPaths for the order history and order detail pages
+ORDER_VIEW_XPATH: Final[str] = (
+    "//a[normalize-space(text())='View'] | //button[normalize-space(text())='View']"
+)
+ORDER_VIEW_LINK_XPATH: Final[str] = (
+    "//a[normalize-space(text())='View' and contains(@class, 'btn')]"
+)
+# The order number label, e.g. "Order No", "Order number", "OrderNo" or "Order #",
+# matched once on the lower-cased text with spaces dropped
+_ORDER_LABEL_TEXT: Final[str] = (
+    "translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ ', 'abcdefghijklmnopqrstuvwxyz')"
+)
+ORDER_NUMBER_XPATH: Final[str] = (
+    f"//*[contains({_ORDER_LABEL_TEXT}, 'orderno') "
+    f"or contains({_ORDER_LABEL_TEXT}, 'ordernumber') "
+    f"or contains({_ORDER_LABEL_TEXT}, 'order#')]"
+)
+# Order toolbar columns, each an h3 title over a p value such as the date or total
+ORDER_TEXT_COLUMNS_CSS: Final[str] = "div.order-toolbar__text-column"
+# The same columns for lxml, which has no CSS selector support installed
+ORDER_TEXT_COLUMNS_XPATH: Final[str] = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), "
+    "' order-toolbar__text-column ')]"
+)
+# Receipt buttons are told apart by the download URL in their onclick
+# (CustomFileDownload/DownloadInvoice), matched case-insensitively on the
+# attribute rather than by scanning each button's text
+RECEIPT_ONCLICK_KEYS: Final[tuple[str, ...]] = ("receipt", "invoice")
+RECEIPT_BUTTONS_CSS: Final[str] = ", ".join(
+    f"div.order-toolbar__row button.btn[onclick*='{key}' i]"
+    for key in RECEIPT_ONCLICK_KEYS
+)
+WINE_NOTES_BUTTONS_CSS: Final[str] = (
+    "div.order-toolbar__group--pull-right.order-toolbar__actions "
+    "button[onclick*='DownloadWineNotesPdf']"
+)
+# The same buttons for lxml; receipt onclicks are then filtered in Python
+ORDER_TOOLBAR_BUTTONS_XPATH: Final[str] = (
+    "//div[contains(@class,'order-toolbar__row')]//button[contains(@class,'btn')]"
+)
+WINE_NOTES_BUTTONS_XPATH: Final[str] = (
+    "//div[contains(@class, 'order-toolbar__group--pull-right') "
+    "and contains(@class, 'order-toolbar__actions')]"
+    "//button[contains(@onclick, 'DownloadWineNotesPdf')]"
+)
+PRODUCT_LINK_CSS: Final[str] = "a[href*='/product/']"
+PRODUCT_LINK_HREFS_XPATH: Final[str] = "//a[contains(@href, '/product/')]/@href"
+ORDER_TEXT_COLUMN_TITLE_XPATH: Final[str] = (
+    ".//h3[contains(@class, 'order-toolbar__text-column-title')]"
+)
+# Distinct absolute product URLs, in page order; a wine is often linked from
+# both its picture and its name
+PRODUCT_LINKS_JS: Final[str] = (
+    "return [...new Set(Array.from("
+    "document.querySelectorAll(arguments[0]), (a) => a.href))];"
+)
+
+# Fetches PDFs from inside the page, with the page's cookies, all at once, and
+# hands back each one's bytes base64-encoded (or its error) in a single round
+# trip; no navigation and no Chrome download to wait for
+FETCH_PDFS_JS: Final[str] = """
+const [urls, done] = [arguments[0], arguments[arguments.length - 1]];
+const fetchPdf = async (url) => {
+    try {
+        const resp = await fetch(url, {credentials: "include"});
+        const type = resp.headers.get("Content-Type") || "";
+        if (!resp.ok || !type.toLowerCase().includes("pdf")) {
+            return {error: `${resp.status} ${type}`};
+        }
+        const bytes = new Uint8Array(await resp.arrayBuffer());
+        let binary = "";
+        for (let i = 0; i < bytes.length; i += 0x8000) {
+            binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+        }
+        return {data: btoa(binary)};
+    } catch (e) {
+        return {error: String(e)};
+    }
+};
+Promise.all(urls.map(fetchPdf)).then(done);
+"""
+
+# Wait conditions, built once and shared by every wait and browser; each only
+# holds its locator, so they are safe to reuse across threads
+LOGIN_FORM_OR_ORDERS_PRESENT = EC.any_of(
+    EC.presence_of_element_located((By.NAME, LOGIN_USERNAME_NAME)),
+    EC.presence_of_element_located((By.XPATH, ORDER_VIEW_XPATH)),
+)
+ORDER_VIEWS_PRESENT = EC.presence_of_element_located((By.XPATH, ORDER_VIEW_XPATH))
+COOKIE_BANNER_CLICKABLE = EC.element_to_be_clickable((By.ID, COOKIE_BANNER_ID))
+
+# Label in front of the order number, e.g. "Order No:", "Order #:", "OrderNumber:"
+ORDER_NUMBER_PREFIX_RE = re.compile(r"^\s*order\s*(?:no|number|#)\s*:\s*", re.I)
+# Download URL in a toolbar button's onclick, e.g. location.href='/Download...'
+ONCLICK_URL_RE = re.compile(r"location\.href\s*=\s*['\"]([^'\"]+)['\"]")
+# Order number in a receipt or wine notes URL, e.g. orderNumber=TWSWEB-13480088
+RECEIPT_ORDER_NUMBER_RE = re.compile(r"orderNumber=TWSWEB-(\d+)")
+
+# Reads every field handle_order_detail_page needs in one round trip to the
+# browser; the selectors above are passed in as arguments. The order number may
+# be passed as an element already found instead of its XPath
+ORDER_DETAIL_JS = """
+const [
+    orderNumberArg, textColumnsCss, receiptButtonsCss, wineNotesButtonsCss,
+    productLinksCss
+] = arguments;
+const first = (xpath) => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const text = (el) => (el ? el.innerText.trim() : null);
+const absolute = (url) => new URL(url, location.href).href;
+
+const orderNumber = typeof orderNumberArg === "string"
+    ? first(orderNumberArg) : orderNumberArg;
+
+const columns = {};
+for (const column of document.querySelectorAll(textColumnsCss)) {
+    const title = column.querySelector("h3.order-toolbar__text-column-title");
+    const value = column.querySelector("p");
+    if (title && value) {
+        columns[title.innerText.trim()] = value.innerText.trim();
+    }
+}
+
+const onclickUrl = (button) => {
+    const match = (button.getAttribute("onclick") || "").match(
+        /location\\.href\\s*=\\s*['"]([^'"]+)['"]/
+    );
+    return match ? absolute(match[1]) : null;
+};
+
+const urls = (css) => Array.from(document.querySelectorAll(css), onclickUrl).filter(
+    (url) => url
+);
+
+return {
+    url: location.href,
+    order_number: text(orderNumber),
+    columns: columns,
+    receipts: urls(receiptButtonsCss),
+    wine_notes: urls(wineNotesButtonsCss),
+    wine_links: [...new Set(
+        Array.from(document.querySelectorAll(productLinksCss), (a) => a.href)
+    )],
+};
+"""
+
+
+def strip_order_number_prefix(order_number: str) -> str:
+    log.info(f"Order number text found: {order_number}")
+    stripped, found = ORDER_NUMBER_PREFIX_RE.subn("", order_number)
+    if found:
+        log.info(f"Stripping off Order No prefix from {order_number}")
+        return stripped.strip()
+    return order_number
+
+
+def _page_field(key: str) -> Callable[[dict], Optional[str]]:
+    return lambda page: page.get(key)
+
+
+def _toolbar_column(title: str) -> Callable[[dict], Optional[str]]:
+    """
+    Read the order toolbar column whose title contains the given text
+    """
+    return lambda page: next(
+        (value for key, value in (page.get("columns") or {}).items() if title in key),
+        None,
+    )
+
+
+# OrderDetail text fields: the field name, its label in logs, how to read it from
+# the read_order_page result, and how to clean up the value found
+ORDER_TEXT_FIELDS: list[
+    tuple[str, str, Callable[[dict], Optional[str]], Callable[[str], str]]
+] = [
+    (
+        "order_number",
+        "Order Number",
+        _page_field("order_number"),
+        strip_order_number_prefix,
+    ),
+    ("order_date", "Order Date", _toolbar_column("Date placed"), str.strip),
+    ("order_total", "Order Total", _toolbar_column("Order total"), str.strip),
+]
+
+
+def ensure_parent_dir(path: str) -> None:
+    """
+    Create the directory a file is about to be written to. It is checked before
+    every write, which costs about a stat, so a directory removed while the
+    scraper runs is created again.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+
+@lru_cache(maxsize=None)
+def compiled_xpath(xpath: str) -> Any:
+    """
+    An XPath compiled once for lxml, rather than parsed again for every page
+    """
+    return etree.XPath(xpath)
+
+
+def parse_order_page(html: str, url: str) -> dict:
+    """
+    Read an order detail page fetched over HTTP into the same dict that
+    ORDER_DETAIL_JS returns from the browser
+    """
+    dom = lxml.html.fromstring(html, base_url=url)
+    dom.make_links_absolute(url)
+
+    def text(el: Any) -> str:
+        return " ".join(el.text_content().split())
+
+    def onclick_url(button: Any) -> Optional[str]:
+        match = ONCLICK_URL_RE.search(button.get("onclick") or "")
+        return urljoin(url, match.group(1)) if match else None
+
+    order_number = compiled_xpath(ORDER_NUMBER_XPATH)(dom)
+    columns = {}
+    for column in compiled_xpath(ORDER_TEXT_COLUMNS_XPATH)(dom):
+        title = compiled_xpath(ORDER_TEXT_COLUMN_TITLE_XPATH)(column)
+        value = compiled_xpath(".//p")(column)
+        if title and value:
+            columns[text(title[0])] = text(value[0])
+    receipts = [
+        receipt_url
+        for button in compiled_xpath(ORDER_TOOLBAR_BUTTONS_XPATH)(dom)
+        if any(
+            key in (button.get("onclick") or "").lower() for key in RECEIPT_ONCLICK_KEYS
+        )
+        and (receipt_url := onclick_url(button))
+    ]
+    wine_notes = [
+        notes_url
+        for button in compiled_xpath(WINE_NOTES_BUTTONS_XPATH)(dom)
+        if (notes_url := onclick_url(button))
+    ]
+    product_links = compiled_xpath(PRODUCT_LINK_HREFS_XPATH)(dom)
+    return {
+        "url": url,
+        "order_number": text(order_number[0]) if order_number else None,
+        "columns": columns,
+        "receipts": receipts,
+        "wine_notes": wine_notes,
+        "wine_links": list(dict.fromkeys(product_links)),
+    }
+
+
+def write_base64(f: Any, data: str, chunk_size: int = PDF_CHUNK_SIZE) -> None:
+    """
+    Decode base64 text into an open binary file a slice at a time, so a large
+    PDF is never held decoded in memory all at once
+    """
+    # Whole 4-character groups decode to whole 3-byte groups independently
+    step = chunk_size // 3 * 4
+    for start in range(0, len(data), step):
+        end = start + step
+        f.write(base64.b64decode(data[start:end]))
+
+
+def wait_for_download(
+    pattern: str, before: set[str], timeout: float, poll: float = DOWNLOAD_POLL
+) -> Optional[str]:
+    """
+    Wait for a file matching pattern that was not in before, and for Chrome to
+    finish writing it (no .crdownload left beside it). Returns the newest such
+    file, or None after timeout seconds.
+    """
+    download_dir = os.path.dirname(pattern)
+    deadline = time.monotonic() + timeout
+    while True:
+        new_files = set(glob(pattern)) - before
+        if new_files and not glob(os.path.join(download_dir, "*.crdownload")):
+            return max(new_files, key=os.path.getmtime)
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll)
+
+
+def make_wait(driver: webdriver.Chrome, timeout: float = WAIT_TIMEOUT) -> WebDriverWait:
+    """
+    Explicit wait that polls quickly and rides out elements that are not there
+    yet or are replaced while the page renders
+    """
+    return WebDriverWait(
+        driver,
+        timeout,
+        poll_frequency=WAIT_POLL,
+        ignored_exceptions=(NoSuchElementException, StaleElementReferenceException),
+    )
+
 
-@dataclass
+def load_scraped_order_urls(path: str = ORDERS_FILE) -> set[str]:
+    """
+    URLs of the orders already written to the orders file, so a resumed run can
+    skip them. A line cut short by an interrupted run is ignored.
+    """
+    urls: set[str] = set()
+    if not os.path.exists(path):
+        return urls
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                urls.add(json.loads(line)["url"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return urls
+
+
+@dataclass(slots=True)
 class OrderDetail:
     order_number: Optional[str]
     order_date: Optional[str]
@@ -36,20 +451,128 @@ class OrderDetail:
     receipts: List[str]
     wine_notes: List[str]
     wine_links: List[str]
-    download_dir: str = "Data"
 
-    def to_dict(self) -> dict:
-        return asdict(self)
+    def to_dict(self, copy: bool = False) -> dict:
+        """
+        The order as a plain dict for JSON or MongoDB. The link lists are
+        shared with the order rather than copied, unless copy is set for a
+        caller that will change them.
+        """
+        receipts, wine_notes, wine_links = (
+            self.receipts,
+            self.wine_notes,
+            self.wine_links,
+        )
+        if copy:
+            receipts, wine_notes, wine_links = (
+                list(receipts),
+                list(wine_notes),
+                list(wine_links),
+            )
+        return {
+            "order_number": self.order_number,
+            "order_date": self.order_date,
+            "order_total": self.order_total,
+            "url": self.url,
+            "pdf_path": self.pdf_path,
+            "receipts": receipts,
+            "wine_notes": wine_notes,
+            "wine_links": wine_links,
+        }
 
 
 class WineSocietyOrderScraperSelenium:
-    def __init__(self, username: str, password: str, start_url: str) -> None:
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        start_url: str,
+        max_browsers: int = MAX_BROWSERS,
+        profile_dir: Optional[str] = CHROME_PROFILE_DIR,
+        headless: bool = True,
+        blocked_urls: Optional[List[str]] = None,
+    ) -> None:
         self.username = username
         self.password = password
         self.start_url = start_url
-        self.download_dir = OrderDetail.download_dir
+        self.download_dir = DOWNLOAD_DIR
+        self.max_browsers = max_browsers
+        # A visible browser is only for watching or debugging a run; saving
+        # order pages with Page.printToPDF needs headless Chrome
+        self.headless = headless
+        # URL patterns every browser is told not to request
+        self.blocked_urls = (
+            BLOCKED_URL_PATTERNS if blocked_urls is None else list(blocked_urls)
+        )
+        # Worker threads each drive their own browser; self.driver and self.wait
+        # resolve to the calling thread's browser, or the main one
+        self._local = threading.local()
+        self._worker_drivers: list[webdriver.Chrome] = []
+        self._worker_profiles: list[str] = []
+        self._worker_drivers_lock = threading.Lock()
+        # Cookies of the logged-in main browser, copied into worker browsers
+        self._login_cookies: list[dict] = []
+        self._main_driver = self._new_driver(
+            os.path.abspath(profile_dir) if profile_dir else None
+        )
+        # Plain HTTP session carrying the browser's login cookies, for downloads
+        self.http: Optional[requests.Session] = None
+        self._main_wait = make_wait(self._main_driver)
+
+    @property
+    def driver(self) -> webdriver.Chrome:
+        driver: webdriver.Chrome = getattr(self._local, "driver", self._main_driver)
+        return driver
+
+    @property
+    def _cookies_accepted(self) -> bool:
+        # Tracked per browser, like self.driver
+        accepted: bool = getattr(self._local, "cookies_accepted", False)
+        return accepted
+
+    @_cookies_accepted.setter
+    def _cookies_accepted(self, accepted: bool) -> None:
+        self._local.cookies_accepted = accepted
+
+    @property
+    def _dom_cache(self) -> dict[str, Any]:
+        """
+        XPath results on the current page's DOM snapshot, per browser. Emptied
+        by _forget_page() whenever the browser moves to another page.
+        """
+        cache: Optional[dict[str, Any]] = getattr(self._local, "dom_cache", None)
+        if cache is None:
+            cache = self._local.dom_cache = {}
+        return cache
+
+    @property
+    def wait(self) -> WebDriverWait:
+        wait: WebDriverWait = getattr(self._local, "wait", self._main_wait)
+        return wait
+
+    def _new_driver(self, profile_dir: Optional[str] = None) -> webdriver.Chrome:
+        """
+        Start a Chrome session configured for scraping. Worker browsers get their
+        own profile directory so parallel sessions never contend for a profile lock.
+        """
         chrome_options = Options()
-        chrome_options.add_argument("--start-maximized")
+        if profile_dir:
+            chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+        # Headless Chrome is also what Page.printToPDF needs; a fixed window size
+        # stands in for --start-maximized, which has no effect without a window
+        if self.headless:
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument("--window-size=1920,1080")
+        else:
+            chrome_options.add_argument("--start-maximized")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        # Return from driver.get() once the DOM is ready rather than waiting for
+        # every image and tracker; the scraper waits for the elements it needs
+        chrome_options.page_load_strategy = "eager"
         chrome_options.add_experimental_option(
             "prefs",
             {
@@ -57,78 +580,322 @@ class WineSocietyOrderScraperSelenium:
                 "download.prompt_for_download": False,
                 "download.directory_upgrade": True,
                 "plugins.always_open_pdf_externally": True,
+                "profile.managed_default_content_settings.images": 2,
             },
         )
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 20)
+        driver = webdriver.Chrome(options=chrome_options)
+        # Lookups for optional elements, such as the cookie banner, must fail
+        # at once rather than after an implicit wait; the explicit waits are
+        # the only ones
+        driver.implicitly_wait(0)
+        self._block_requests(driver)
+        return driver
+
+    def _block_requests(self, driver: webdriver.Chrome) -> None:
+        """
+        Block image, font and tracker requests in the driver's current tab.
+        Blocked URLs are set per tab, so every new tab needs this too.
+        """
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd(
+                "Network.setBlockedURLs", {"urls": self.blocked_urls}
+            )
+        except WebDriverException as e:
+            log.warning(f"Could not block image, font and tracker requests: {e}")
+
+    def _ensure_worker_driver(self) -> None:
+        """
+        Give the calling worker thread its own logged-in browser on first use.
+        The main browser's login cookies are copied into it; it only logs in
+        itself when there are none to copy.
+        """
+        if getattr(self._local, "driver", None) is not None:
+            return
+        profile_dir = tempfile.mkdtemp(prefix="wine_soc_chrome_")
+        driver = self._new_driver(profile_dir)
+        with self._worker_drivers_lock:
+            self._worker_drivers.append(driver)
+            self._worker_profiles.append(profile_dir)
+        self._local.driver = driver
+        self._local.wait = make_wait(driver)
+        if not self._login_cookies:
+            self.login()
+            return
+        driver.get(SITE_URL)
+        for cookie in self._login_cookies:
+            try:
+                driver.add_cookie(cookie)
+            except WebDriverException as e:
+                log.warning(f"Could not copy cookie {cookie.get('name')}: {e}")
+                continue
+            # The copied consent cookie keeps the banner away in this browser too
+            if cookie.get("name") == COOKIE_CONSENT_COOKIE:
+                self._cookies_accepted = True
 
     def login(self) -> None:
         """
         Log in to the Wine Society website using Selenium, then navigate to the order
-        history page.
+        history page. A browser whose saved profile is still logged in goes
+        straight to the order history and the login form is skipped.
         """
         self.driver.get(self.start_url)
-        # Wait for login form
-        self.wait.until(
-            EC.presence_of_element_located((By.NAME, "SubmissionModel.Username"))
+        # Wait for the login form, or the order history if already logged in
+        found = self.wait.until(LOGIN_FORM_OR_ORDERS_PRESENT)
+        if found.get_attribute("name") == LOGIN_USERNAME_NAME:
+            email_input = found
+            password_input = self.driver.find_element(By.NAME, LOGIN_PASSWORD_NAME)
+            email_input.clear()
+            email_input.send_keys(self.username)
+            password_input.clear()
+            password_input.send_keys(self.password)
+            password_input.send_keys(Keys.RETURN)
+            # After login, navigate directly to the order history page
+            self.driver.get(ORDER_HISTORY_URL)
+        else:
+            log.info("Already logged in; skipping the login form.")
+        self._forget_page()
+        # A consent cookie saved in the profile means the banner will not show
+        if self.driver.get_cookie(COOKIE_CONSENT_COOKIE):
+            self._cookies_accepted = True
+        # Try to click the "Accept All Cookies" button if it exists
+        if not self._cookies_accepted:
+            try:
+                accept_cookies_btn = self.wait.until(COOKIE_BANNER_CLICKABLE)
+                accept_cookies_btn.click()
+                self._cookies_accepted = True
+                log.info("Accepted cookies.")
+            except Exception:
+                log.warning(
+                    "No 'Accept All Cookies' button found or could not click it."
+                )
+        # Wait for the order history page to load (look for 'View' buttons)
+        self.wait.until(ORDER_VIEWS_PRESENT)
+        if self.http is None:
+            self.http = self._session_from_driver()
+
+    def _session_from_driver(self) -> requests.Session:
+        """
+        Build a requests session authenticated with the browser's cookies
+        """
+        session = requests.Session()
+        # Enough pooled connections for every HTTP worker to keep one open;
+        # threads beyond that wait for a free connection rather than opening
+        # extra ones, so the site never sees more than HTTP_WORKERS at once
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=HTTP_WORKERS, pool_maxsize=HTTP_WORKERS, pool_block=True
         )
-        email_input = self.driver.find_element(By.NAME, "SubmissionModel.Username")
-        password_input = self.driver.find_element(By.NAME, "SubmissionModel.Password")
-        email_input.clear()
-        email_input.send_keys(self.username)
-        password_input.clear()
-        password_input.send_keys(self.password)
-        password_input.send_keys(Keys.RETURN)
-        # After login, navigate directly to the order history page
-        order_history_url = (
-            "https://www.thewinesociety.com/my-account/order-history/?page=1&months=19"
-            "&epmonths=6&isEnPrimeur=False"
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["User-Agent"] = self.driver.execute_script(
+            "return navigator.userAgent;"
         )
-        self.driver.get(order_history_url)
-        # Try to click the "Accept All Cookies" button if it exists
+        for cookie in self.driver.get_cookies():
+            session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/"),
+            )
+        return session
+
+    def _download_with_session(self, url: str, dest_path: str) -> bool:
+        """
+        Fetch a PDF over HTTP with the session cookies and stream it to dest_path.
+        Returns False when the response is not a PDF, e.g. a login redirect.
+        """
+        if self.http is None:
+            return False
+        part_path = f"{dest_path}.part"
+        try:
+            resp = self.http.get(url, timeout=60, stream=True)
+            try:
+                resp.raise_for_status()
+                content_type = resp.headers.get("Content-Type", "")
+                if "pdf" not in content_type.lower():
+                    log.warning(f"Expected a PDF from {url}, got {content_type}")
+                    return False
+                ensure_parent_dir(dest_path)
+                # Undo any gzip/deflate transfer encoding while copying
+                resp.raw.decode_content = True
+                with open(part_path, "wb") as f:
+                    shutil.copyfileobj(resp.raw, f)
+            finally:
+                resp.close()
+            os.replace(part_path, dest_path)
+            log.info(f"Saved {dest_path}")
+            return True
+        except Exception as e:
+            log.error(f"Error downloading {url}: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return False
+
+    def _receipt_path(self, receipt_url: str) -> str:
+        """
+        Where a receipt is saved: Data/receipts, named for the order number in
+        its URL (a unique name, so it never clashes with the wine notes)
+        """
+        order_number = self.extract_order_num_from_receipt_url(receipt_url)
+        return os.path.join("Data", "receipts", f"receipt_{order_number}.pdf")
+
+    def _copy_saved_receipt(self, pdf_path: str, receipt_url: str) -> bool:
+        """
+        Copy a receipt already saved as the order PDF to its place in
+        Data/receipts, rather than downloading it a second time
+        """
+        dest_path = self._receipt_path(receipt_url)
         try:
-            accept_cookies_btn = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
+            ensure_parent_dir(dest_path)
+            shutil.copyfile(pdf_path, dest_path)
+        except OSError as e:
+            log.warning(f"Could not copy receipt {pdf_path} to {dest_path}: {e}")
+            return False
+        log.info(f"Saved {dest_path}")
+        return True
+
+    def download_order_pdfs(
+        self,
+        receipt_links: List[str],
+        wine_notes_links: List[str],
+        browser_fallback: bool = True,
+    ) -> None:
+        """
+        Download receipt and wine notes PDFs in parallel over HTTP. Anything the
+        session cannot fetch is downloaded through the browser instead, unless
+        browser_fallback is False (the caller's thread has no browser of its own).
+        Without a browser the caller is one of the HTTP_WORKERS threads, so the
+        PDFs are downloaded one at a time on that thread rather than in parallel.
+        """
+        tasks = [
+            (link, self._receipt_path(link), "receipt") for link in receipt_links
+        ] + [
+            (
+                link,
+                os.path.join(
+                    "Data",
+                    "wine_notes",
+                    f"wine_notes_{self.extract_order_num_from_receipt_url(link)}.pdf",
+                ),
+                "Wine Notes",
             )
-            accept_cookies_btn.click()
-            log.info("Accepted cookies.")
-        except Exception:
-            log.warning("No 'Accept All Cookies' button found or could not click it.")
-        # Wait for the order history page to load (look for 'View' buttons)
-        self.wait.until(
-            EC.presence_of_element_located(
-                (
-                    By.XPATH,
-                    "//a[normalize-space(text())='View'] | "
-                    "//button[normalize-space(text())='View']",
+            for link in wine_notes_links
+        ]
+        if not tasks:
+            return
+        if browser_fallback:
+            with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+                saved = list(
+                    executor.map(
+                        lambda t: self._download_with_session(t[0], t[1]), tasks
+                    )
                 )
-            )
+        else:
+            saved = [self._download_with_session(link, path) for link, path, _ in tasks]
+        failed = [task for task, ok in zip(tasks, saved) if not ok]
+        if not browser_fallback:
+            for link, _, label in failed:
+                log.warning(f"Could not download {label} PDF from {link}")
+            return
+        if not failed:
+            return
+        # Browser fallback runs on this thread, which owns the browser: the page
+        # fetches every remaining PDF in one script, and anything it could not
+        # fetch is downloaded by navigating to it
+        fetched = self._download_with_page_fetches(
+            [(link, dest_path) for link, dest_path, _ in failed]
         )
+        for (link, dest_path, label), ok in zip(failed, fetched):
+            if not ok:
+                self._download_with_navigation(link, dest_path, label, DOWNLOAD_TIMEOUT)
 
-    def get_order_view_buttons(self) -> list[Any]:
+    def _get_dom(self) -> lxml.html.HtmlElement:
         """
-        Find all 'View' buttons on the order history page.
-        Returns a list of WebElement objects.
+        Snapshot the current page in one round trip and parse it with lxml, so
+        attributes can be read without a WebDriver call per element. Links in
+        the snapshot are made absolute against the page URL. The snapshot is
+        kept until _forget_page() is called.
         """
-        return self.driver.find_elements(
-            By.XPATH, "//a[normalize-space(text())='View' and contains(@class, 'btn')]"
-        )
+        dom: Optional[lxml.html.HtmlElement] = getattr(self._local, "dom", None)
+        if dom is None:
+            html, url = self.driver.execute_script(
+                "return [document.documentElement.outerHTML, location.href];"
+            )
+            dom = lxml.html.fromstring(html, base_url=url)
+            dom.make_links_absolute(url)
+            self._local.dom = dom
+        return dom
 
-    def save_order_page_as_pdf(self, output_path: str) -> None:
+    def _xpath(self, xpath: str) -> list[Any]:
+        """
+        Evaluate an XPath on the current page's DOM snapshot, reusing the result
+        if it has already been looked up on this page
+        """
+        cache = self._dom_cache
+        if xpath not in cache:
+            cache[xpath] = compiled_xpath(xpath)(self._get_dom())
+        found: list[Any] = cache[xpath]
+        return found
+
+    def _forget_page(self) -> None:
+        """
+        Drop the DOM snapshot and cached lookups once the browser leaves a page
+        """
+        self._local.dom = None
+        self._dom_cache.clear()
+
+    def get_order_view_hrefs(self) -> list[str]:
+        """
+        URLs behind the 'View' buttons on the order history page
+        """
+        return self._xpath(f"{ORDER_VIEW_LINK_XPATH}/@href")
+
+    def save_order_page_as_pdf(
+        self, output_path: str, receipt_url: Optional[str] = None
+    ) -> None:
         """
         Save the current order detail page as a PDF using Chrome's print-to-PDF feature.
         Requires Chrome to be started with --headless=new and --disable-gpu for PDF output.
+        When the order has a server-rendered receipt, that PDF is downloaded over
+        HTTP instead, which avoids re-rendering the page.
         """
+        if receipt_url and self._download_with_session(receipt_url, output_path):
+            return
         try:
-            pdf = self.driver.execute_cdp_cmd(
-                "Page.printToPDF", {"printBackground": True}
-            )
-            with open(output_path, "wb") as f:
-                f.write(base64.b64decode(pdf["data"]))
+            pdf = self.driver.execute_cdp_cmd("Page.printToPDF", PRINT_TO_PDF_OPTIONS)
+            ensure_parent_dir(output_path)
+            # Chunks are already large, so they go straight to the file
+            # rather than through another buffer
+            with open(output_path, "wb", buffering=0) as f:
+                if "stream" in pdf:
+                    self._copy_cdp_stream(pdf["stream"], f)
+                else:
+                    # Browsers without stream support return the PDF inline
+                    write_base64(f, pdf["data"])
             log.info(f"Saved PDF to {output_path}")
         except Exception as e:
             log.error(f"Error saving PDF: {e}")
 
+    def _copy_cdp_stream(self, handle: str, f: Any) -> None:
+        """
+        Copy a DevTools IO stream to an open binary file chunk by chunk, then
+        close the stream
+        """
+        try:
+            while True:
+                chunk = self.driver.execute_cdp_cmd(
+                    "IO.read", {"handle": handle, "size": PDF_CHUNK_SIZE}
+                )
+                data = chunk.get("data", "")
+                if chunk.get("base64Encoded"):
+                    write_base64(f, data)
+                else:
+                    f.write(data.encode())
+                if chunk.get("eof"):
+                    break
+        finally:
+            self.driver.execute_cdp_cmd("IO.close", {"handle": handle})
+
     def extract_order_num_from_receipt_url(self, receipt_url: str) -> str:
 
         # example receipt_url
@@ -137,7 +904,7 @@ class WineSocietyOrderScraperSelenium:
         # we want the order_num as the numeric part of the last part of the URL
         # i.e. orderNumber=TWSWEB-13480088 -> 13480088
 
-        match = re.search(r"orderNumber=TWSWEB-(\d+)", receipt_url)
+        match = RECEIPT_ORDER_NUMBER_RE.search(receipt_url)
         order_num = match.group(1) if match else ""
 
         if order_num == "":
@@ -147,383 +914,449 @@ class WineSocietyOrderScraperSelenium:
 
         return order_num
 
-    def download_receipt_pdf(self, receipt_url: str, sleep_time: int = 5) -> None:
+    def _download_with_browser(
+        self, url: str, dest_path: str, label: str, timeout: float
+    ) -> Optional[str]:
         """
-        Download the receipt PDF from the given URL and save it to Data/receipts.
-        The filename will be based on the order number in the URL.
+        Download a TWSWEB PDF through the browser and move it to dest_path.
+        The page fetches the PDF itself when it can; otherwise the browser
+        navigates to it and this waits only until Chrome has finished writing
+        the file, up to timeout seconds. Returns dest_path, or None if nothing
+        was downloaded.
         """
-        try:
-            self.driver.get(receipt_url)
-
-            log.info(
-                "Waiting for download to initiate and complete... (this might take a few seconds)"
-            )
-            time.sleep(sleep_time)
-
-            # Assume download_dir is set elsewhere in the class or as a constant
-            download_dir = getattr(self, "download_dir", "Data/downloads")
-            receipts_dir = os.path.join("Data", "receipts")
-            os.makedirs(receipts_dir, exist_ok=True)
-
-            # Extract the filename from the URL
-            order_number = self.extract_order_num_from_receipt_url(receipt_url)
-
-            # Try to match a file in the download_dir with the format TWSWEB-<order_number>*.pdf
-            pattern = os.path.join(download_dir, f"TWSWEB-{order_number}*.pdf")
-            matching_files = glob(pattern)
-            if matching_files:
-                # Use the most recent file (by modification time)
-                matching_files.sort(key=os.path.getmtime, reverse=True)
-                filename = os.path.basename(matching_files[0])
-            else:
-                filename = None
-
-            if filename:
-                src_path = os.path.join(download_dir, filename)
-                # Make a unique name in receipts_dir to avoid clashing with wine notes
-                dest_path = os.path.join(receipts_dir, f"receipt_{order_number}.pdf")
-
-                if os.path.exists(src_path):
-                    try:
-                        os.rename(src_path, dest_path)
-                        log.info(f"Moved receipt PDF to {dest_path}")
-                    except Exception as e:
-                        log.error(f"Error moving receipt PDF: {e}")
-                else:
-                    log.warning(f"Receipt PDF not found at {src_path}")
-
-        except Exception as e:
-            log.error(f"Error downloading receipt: {e}")
+        if self._download_with_page_fetch(url, dest_path):
+            return dest_path
+        return self._download_with_navigation(url, dest_path, label, timeout)
 
-    def download_wine_notes_pdf(self, wine_notes_url: str, sleep_time: int = 5) -> None:
+    def _download_with_navigation(
+        self, url: str, dest_path: str, label: str, timeout: float
+    ) -> Optional[str]:
         """
-        Download the wine notes PDF from the given URL and save it to Data/receipts.
-        The filename will be based on the order number in the URL.
+        Navigate the browser to a TWSWEB PDF and move the download to dest_path
+        once Chrome has finished writing it, up to timeout seconds
         """
         try:
-            self.driver.get(wine_notes_url)
+            download_dir = self.download_dir
+            ensure_parent_dir(dest_path)
+            order_number = self.extract_order_num_from_receipt_url(url)
+            # Match files in the download_dir with the format TWSWEB-<order_number>*.pdf
+            pattern = os.path.join(download_dir, f"TWSWEB-{order_number}*.pdf")
+            before = set(glob(pattern))
 
-            log.info(
-                "Waiting for download to initiate and complete... (this might take a few seconds)"
-            )
-            time.sleep(sleep_time)
+            self.driver.get(url)
+            log.info("Waiting for download to complete...")
+            src_path = wait_for_download(pattern, before, timeout)
+            if src_path is None:
+                log.warning(f"{label} PDF not downloaded from {url}")
+                return None
 
-            # Assume download_dir is set elsewhere in the class or as a constant
-            download_dir = getattr(self, "download_dir", "Data/downloads")
-            wine_notes_dir = os.path.join("Data", "wine_notes")
-            os.makedirs(wine_notes_dir, exist_ok=True)
+            try:
+                os.replace(src_path, dest_path)
+                log.info(f"Moved {label} PDF to {dest_path}")
+                return dest_path
+            except Exception as e:
+                log.error(f"Error moving {label} PDF: {e}")
+        except Exception as e:
+            log.error(f"Error downloading {label}: {e}")
+        return None
 
-            # Extract the filename from the URL
-            order_number = self.extract_order_num_from_receipt_url(wine_notes_url)
+    def _download_with_page_fetch(self, url: str, dest_path: str) -> bool:
+        """
+        Fetch a PDF from within the current page, which carries the browser's
+        cookies, and write its bytes to dest_path. Returns False if the page
+        could not fetch a PDF.
+        """
+        return self._download_with_page_fetches([(url, dest_path)])[0]
 
-            # Try to match a file in the download_dir with the format TWSWEB-<order_number>*.pdf
-            pattern = os.path.join(download_dir, f"TWSWEB-{order_number}*.pdf")
-            matching_files = glob(pattern)
-            if matching_files:
-                # Use the most recent file (by modification time)
-                matching_files.sort(key=os.path.getmtime, reverse=True)
-                filename = os.path.basename(matching_files[0])
-            else:
-                filename = None
-
-            if filename:
-                src_path = os.path.join(download_dir, filename)
-                dest_path = os.path.join(
-                    wine_notes_dir, f"wine_notes_{order_number}.pdf"
+    def _download_with_page_fetches(self, tasks: List[tuple[str, str]]) -> list[bool]:
+        """
+        Fetch several PDFs from within the current page in one script call,
+        writing each (url, dest_path) task's bytes to its path. Returns whether
+        each task's PDF was saved.
+        """
+        try:
+            results = (
+                self.driver.execute_async_script(
+                    FETCH_PDFS_JS, [url for url, _ in tasks]
                 )
+                or []
+            )
+        except Exception as e:
+            log.error(f"Error fetching PDFs in the page: {e}")
+            return [False] * len(tasks)
+        saved = []
+        for index, (url, dest_path) in enumerate(tasks):
+            result = results[index] if index < len(results) else {}
+            if "data" not in result:
+                log.warning(f"Page fetch of {url} failed: {result.get('error')}")
+                saved.append(False)
+                continue
+            try:
+                ensure_parent_dir(dest_path)
+                with open(dest_path, "wb", buffering=0) as f:
+                    write_base64(f, result["data"])
+                log.info(f"Saved {dest_path}")
+                saved.append(True)
+            except OSError as e:
+                log.error(f"Error saving {url} to {dest_path}: {e}")
+                saved.append(False)
+        return saved
 
-                if os.path.exists(src_path):
-                    try:
-                        os.rename(src_path, dest_path)
-                        log.info(f"Moved Wine Notes PDF to {dest_path}")
-                    except Exception as e:
-                        log.error(f"Error moving Wine Notes PDF: {e}")
-                else:
-                    log.warning(f"Wine Notes PDF not found at {src_path}")
+    def download_receipt_pdf(
+        self, receipt_url: str, timeout: float = DOWNLOAD_TIMEOUT
+    ) -> Optional[str]:
+        """
+        Download the receipt PDF from the given URL and save it to Data/receipts.
+        The filename will be based on the order number in the URL.
+        The PDF is fetched over HTTP with the login cookies when possible, and
+        through the browser otherwise.
+        Returns the saved path, or None if the download did not complete.
+        """
+        dest_path = self._receipt_path(receipt_url)
+        if self._download_with_session(receipt_url, dest_path):
+            return dest_path
+        return self._download_with_browser(receipt_url, dest_path, "receipt", timeout)
 
-        except Exception as e:
-            log.error(f"Error downloading Wine Notes: {e}")
+    def download_wine_notes_pdf(
+        self, wine_notes_url: str, timeout: float = DOWNLOAD_TIMEOUT
+    ) -> Optional[str]:
+        """
+        Download the wine notes PDF from the given URL and save it to Data/wine_notes.
+        The filename will be based on the order number in the URL.
+        The PDF is fetched over HTTP with the login cookies when possible, and
+        through the browser otherwise.
+        Returns the saved path, or None if the download did not complete.
+        """
+        order_number = self.extract_order_num_from_receipt_url(wine_notes_url)
+        dest_path = os.path.join("Data", "wine_notes", f"wine_notes_{order_number}.pdf")
+        if self._download_with_session(wine_notes_url, dest_path):
+            return dest_path
+        return self._download_with_browser(
+            wine_notes_url, dest_path, "Wine Notes", timeout
+        )
 
-    def download_wine_notes_from_order_page(self, sleep_time: int = 5) -> Optional[str]:
+    def download_wine_notes_from_order_page(
+        self, timeout: float = DOWNLOAD_TIMEOUT
+    ) -> Optional[str]:
         """
         Find the 'Download wine notes' button in the toolbar, extract the download URL,
         and trigger the download via Selenium.
         Returns the download URL if found and triggered, else None.
         """
         try:
-            toolbar_div = self.driver.find_element(
-                By.XPATH,
-                "//div[contains(@class, 'order-toolbar__group--pull-right') "
-                "and contains(@class, 'order-toolbar__actions')]",
-            )
-            # Find all button elements within the div
-            buttons = toolbar_div.find_elements(By.TAG_NAME, "button")
-            for button in buttons:
-                onclick = button.get_attribute("onclick")
-                if onclick and "DownloadWineNotesPdf" in onclick:
+            # The toolbar's wine notes buttons, found by their onclick
+            for button in self._xpath(WINE_NOTES_BUTTONS_XPATH):
+                onclick = button.get("onclick")
+                if onclick:
                     # Extract the URL from the onclick attribute
-                    match = re.search(
-                        r"location\.href\s*=\s*['\"]([^'\"]+)['\"]", onclick
-                    )
+                    match = ONCLICK_URL_RE.search(onclick)
                     if match:
-                        url_part = match.group(1)
-                        # If the URL is relative, prepend the base URL
-                        if url_part.startswith("/"):
-                            base_url = (
-                                self.driver.current_url.split("/")[0]
-                                + "//"
-                                + self.driver.current_url.split("/")[2]
-                            )
-                            full_url = base_url + url_part
-                        else:
-                            full_url = url_part
+                        # If the URL is relative, resolve it against the page
+                        base_url = self._get_dom().base_url
+                        full_url: str = urljoin(base_url, match.group(1))
                         log.info(f"Triggering download of wine notes from: {full_url}")
-                        self.driver.get(full_url)
-                        time.sleep(sleep_time)
-
-                        # log a warning if the receipt links are not found
-                        if not full_url:
-                            log.warning(
-                                "No wine notes  link found on the order detail page."
-                            )
-                        else:
-                            # download the receipt pdfs
-                            self.download_wine_notes_pdf(full_url)
+                        self.download_wine_notes_pdf(full_url, timeout)
+                        return full_url
+            log.warning("No wine notes link found on the order detail page.")
             return None
         except Exception as e:
             log.error(f"Error downloading wine notes from toolbar: {e}")
             return None
 
-    def follow_wine_links(self) -> None:
+    def follow_wine_links(self) -> list[str]:
         """
-        Find and follow each available wine link on the order detail page.
-        Opens each wine link in a new tab and prints the URL (can be extended to scrape details).
+        Collect the wine (product) links on the order detail page.
+        The links are read from the current page without navigating to them; the
+        product pages can be fetched later if their details are needed.
         """
         try:
-            wine_links = self.driver.find_elements(
-                By.XPATH, "//a[contains(@href, '/product/')]"
-            )
-            for link in wine_links:
-                href = link.get_attribute("href")
-                if href:
-                    self.driver.execute_script(f"window.open('{href}', '_blank');")
-                    log.info(f"Opened wine link: {href}")
-                    self.driver.switch_to.window(self.driver.window_handles[-1])
-                    time.sleep(1)
-                    self.driver.close()
-                    self.driver.switch_to.window(self.driver.window_handles[0])
-        except Exception as e:
-            log.error(f"Error following wine links: {e}")
-
-    def extract_order_number_from_element(self, order_number_elem) -> str | None:
-        order_number = order_number_elem.text
-        log.info(f"Order number text found: {order_number}")
-        for prefix in [
-            "Order No:",
-            "Order number:",
-            "Order #:",
-            "Order no:",
-            "OrderNo:",
-            "OrderNumber:",
-        ]:
-            if order_number.startswith(prefix):
-                log.info(f"Stripping off Order No: {prefix} from {order_number}")
-                order_number = order_number[len(prefix) :].strip()  # noqa: E203
-                break
-        return order_number
-
-    def extract_order_date_from_h3(self, order_date_h3) -> str | None:
-        try:
-            order_date_div = order_date_h3.find_element(By.XPATH, "./parent::div")
-            order_date_p = order_date_div.find_element(By.TAG_NAME, "p")
-            return order_date_p.text.strip()
+            # Only the hrefs come back, in one script call, rather than the
+            # whole page; kept with the page's other cached lookups
+            cache = self._dom_cache
+            if PRODUCT_LINK_CSS not in cache:
+                cache[PRODUCT_LINK_CSS] = (
+                    self.driver.execute_script(PRODUCT_LINKS_JS, PRODUCT_LINK_CSS) or []
+                )
+            hrefs: list[str] = cache[PRODUCT_LINK_CSS]
+            log.info(f"Found {len(hrefs)} wine links.")
+            return hrefs
         except Exception as e:
-            log.error(f"Error extracting order date from h3: {e}")
-            return None
+            log.error(f"Error collecting wine links: {e}")
+            return []
 
-    def extract_order_total_from_div(self, order_total_div) -> str | None:
-        try:
-            order_total_p = order_total_div.find_element(By.TAG_NAME, "p")
-            return order_total_p.text.strip()
-        except Exception as e:
-            log.error(f"Error extracting order total from div: {e}")
-            return None
+    def extract_order_number_from_element(self, order_number: Any) -> str | None:
+        """
+        Order number without its label, from the raw text read by
+        ORDER_DETAIL_JS or from an element holding it
+        """
+        text = order_number if isinstance(order_number, str) else order_number.text
+        return strip_order_number_prefix(text) if text else None
 
-    def download_receipt_pdfs_from_page(self) -> list[str]:
+    def read_order_page(self, order_number_elem: Optional[Any] = None) -> dict:
         """
-        Find all receipt download buttons on the page, extract their URLs, and trigger downloads.
-        Returns a list of the receipt URLs found.
+        Read the order fields and download links from the current order detail
+        page in a single script call. An order number element that has already
+        been found is reused rather than searched for again.
         """
-        receipt_links = []
-        try:
-            # Find the button with the correct class and text for "Download receipt"
-            receipt_buttons = self.driver.find_elements(
-                By.XPATH,
-                (
-                    "//div[contains(@class,'order-toolbar__row')]//button[contains(@class,'btn') "
-                    "and contains(translate(text(),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), "
-                    "'download receipt')]"
-                ),
+        data: dict = (
+            self.driver.execute_script(
+                ORDER_DETAIL_JS,
+                order_number_elem or ORDER_NUMBER_XPATH,
+                ORDER_TEXT_COLUMNS_CSS,
+                RECEIPT_BUTTONS_CSS,
+                WINE_NOTES_BUTTONS_CSS,
+                PRODUCT_LINK_CSS,
             )
+            or {}
+        )
+        return data
 
-            for btn in receipt_buttons:
-                onclick = btn.get_attribute("onclick")
-                if onclick and "location.href=" in onclick:
-                    # Extract the URL from the onclick attribute
-                    url_part = onclick.split("location.href=")[1].strip().strip("'\";")
-                    # If the URL is relative, prepend the base URL
-                    if url_part.startswith("/"):
-                        base_url = (
-                            self.driver.current_url.split("/")[0]
-                            + "//"
-                            + self.driver.current_url.split("/")[2]
-                        )
-                        full_url = base_url + url_part
-                    else:
-                        full_url = url_part
-                    receipt_links.append(full_url)
-
-            # log a warning if the receipt links are not found
-            if not receipt_links:
-                log.warning("No receipt link found on the order detail page.")
-            else:
-                # download the receipt pdfs
-                for link in receipt_links:
-                    self.download_receipt_pdf(link)
-        except Exception as e:
-            log.error(f"Error downloading receipt or notes: {e}")
-
-        return receipt_links
+    def _rendered_order_page(self, _: Any) -> Union[dict, Literal[False]]:
+        """
+        Wait condition: the order page's fields once its order number is there
+        """
+        page = self.read_order_page()
+        return page if page.get("order_number") else False
 
     def handle_order_detail_page(
         self, output_dir: str = "order_details"
     ) -> Optional[OrderDetail]:
         """
         Extract order number, order date, and order total from the order detail page.
-        Save the page as PDF, download receipts and wine notes, and follow wine links.
+        Save the page as PDF, download receipts and wine notes, and collect wine links.
         Returns an OrderDetail dataclass instance for MongoDB storage.
         """
-        # Click the "Accept All Cookies" button if it exists
+        # Click the "Accept All Cookies" button if it exists; consent lasts for
+        # the browser session, so once accepted the check is skipped
+        if not self._cookies_accepted:
+            try:
+                accept_btn = self.driver.find_element(By.ID, COOKIE_BANNER_ID)
+                if accept_btn.is_displayed() and accept_btn.is_enabled():
+                    accept_btn.click()
+                    # Carry on as soon as the banner is gone rather than after a fixed pause
+                    make_wait(self.driver, 5).until(
+                        EC.invisibility_of_element(accept_btn)
+                    )
+                    self._cookies_accepted = True
+            except WebDriverException as e:
+                log.debug(f"Cookie banner not handled: {e}")
+
         try:
-            accept_btn = self.driver.find_element(By.ID, "onetrust-accept-btn-handler")
-            if accept_btn.is_displayed() and accept_btn.is_enabled():
-                accept_btn.click()
-                time.sleep(1)
-        except Exception:
-            pass
+            # Read every field in one script rather than a lookup per element,
+            # polling with that script until the order number has rendered so
+            # there is no separate wait for it
+            data: dict = self.wait.until(self._rendered_order_page)
+            if not data.get("url"):
+                data["url"] = self.driver.current_url
+            return self._order_from_page(data, output_dir)
+        except Exception as e:
+            log.error(f"Error extracting order details: {e}")
+            return None
 
+    def _order_from_page(
+        self, data: dict, output_dir: str, in_browser: bool = True
+    ) -> Optional[OrderDetail]:
+        """
+        Build the OrderDetail for a read order page, saving its PDF and
+        downloading its receipts and wine notes. Without a browser (in_browser
+        False) the page PDF must come from the receipt; None is returned when
+        it cannot, so the order can be scraped in a browser instead.
+        """
         try:
-            self.wait.until(
-                EC.presence_of_element_located(
-                    (
-                        By.XPATH,
-                        "//*[contains(text(), 'Order No') or contains(text(), 'Order number') "
-                        "or contains(text(), 'Order #') or contains(text(), 'Order no') "
-                        "or contains(text(), 'OrderNo') or contains(text(), 'OrderNumber')]",
-                    )
-                )
-            )
-            # Extract order number
-            try:
-                order_number_elem = self.driver.find_element(
-                    By.XPATH,
-                    "//*[contains(text(), 'Order No') or contains(text(), 'Order number') "
-                    "or contains(text(), 'Order #') or contains(text(), 'Order no') "
-                    "or contains(text(), 'OrderNo') or contains(text(), 'OrderNumber')]",
-                )
-                order_number = self.extract_order_number_from_element(order_number_elem)
-            except Exception:
-                order_number = None
-                log.error("Order Number could not be found on the order detail page.")
+            fields: dict[str, Optional[str]] = {}
+            for name, label, read, clean in ORDER_TEXT_FIELDS:
+                value = read(data)
+                fields[name] = clean(value) if value else None
+                if not value:
+                    log.error(f"{label} could not be found on the order detail page.")
+            receipt_links: List[str] = data.get("receipts") or []
+            wine_notes_links: List[str] = data.get("wine_notes") or []
+            wine_links: List[str] = data.get("wine_links") or []
+            url: str = data.get("url") or ""
 
-            # Extract order date
-            try:
-                order_date_h3 = self.driver.find_element(
-                    By.XPATH,
-                    "//h3[contains(@class, 'order-toolbar__text-column-title') "
-                    "and contains(normalize-space(), 'Date placed')]",
-                )
-                order_date = self.extract_order_date_from_h3(order_date_h3)
-            except Exception:
-                order_date = None
-                log.error("Order Date could not be found on the order detail page.")
-            # Extract order total
-            try:
-                order_total_div = self.driver.find_element(
-                    By.XPATH,
-                    "//div[contains(@class, 'order-toolbar__text-column')][.//h3[contains(@class, "
-                    "'order-toolbar__text-column-title') and contains(normalize-space(), 'Order total')]]",
-                )
-                order_total = self.extract_order_total_from_div(order_total_div)
-            except Exception:
-                order_total = None
-                log.error("Order Total could not be found on the order detail page.")
             # 1. Save the page as PDF
             pdf_path = os.path.join(
-                output_dir, f"{order_number or 'unknown_order'}.pdf"
+                output_dir, f"{fields['order_number'] or 'unknown_order'}.pdf"
             )
-            self.save_order_page_as_pdf(pdf_path)
-
-            # 2. Download receipt (collect links)
-            receipt_links = self.download_receipt_pdfs_from_page()
+            # The server-rendered receipt stands in for the page when the
+            # session can fetch it; it is then reused rather than fetched again
+            receipt_saved = bool(receipt_links) and self._download_with_session(
+                receipt_links[0], pdf_path
+            )
+            if not receipt_saved:
+                if not in_browser:
+                    return None
+                self.save_order_page_as_pdf(pdf_path)
 
-            # 3. Download wine notes using the new function
-            wine_notes_links: List[str] = []
-            try:
-                wine_notes_url = self.download_wine_notes_from_order_page()
-                if wine_notes_url:
-                    wine_notes_links.append(wine_notes_url)
-            except Exception as e:
-                log.error(f"Error downloading wine notes: {e}")
+            # 2. Download receipts and wine notes
+            if not receipt_links:
+                log.warning("No receipt link found on the order detail page.")
+            to_download = receipt_links
+            if receipt_saved and self._copy_saved_receipt(pdf_path, receipt_links[0]):
+                to_download = receipt_links[1:]
+            self.download_order_pdfs(
+                to_download, wine_notes_links, browser_fallback=in_browser
+            )
 
-            log.info(f"Order Number: {order_number}")
-            log.info(f"Order Date: {order_date}")
-            log.info(f"Order Total: {order_total}")
+            for name, label, _, _ in ORDER_TEXT_FIELDS:
+                log.info(f"{label}: {fields[name]}")
             log.info(f"PDF Path: {pdf_path}")
             log.info(f"Receipts: {receipt_links}")
             log.info(f"Wine Notes: {wine_notes_links}")
+            log.info(f"Wine Links: {len(wine_links)}")
 
             return OrderDetail(
-                order_number=order_number,
-                order_date=order_date,
-                order_total=order_total,
-                url=self.driver.current_url,
+                order_number=fields["order_number"],
+                order_date=fields["order_date"],
+                order_total=fields["order_total"],
+                url=url,
                 pdf_path=pdf_path,
                 receipts=receipt_links,
                 wine_notes=wine_notes_links,
-                wine_links=wine_notes_links,
+                wine_links=wine_links,
             )
         except Exception as e:
             log.error(f"Error extracting order details: {e}")
             return None
 
-    def scrape_all_orders(self) -> List[OrderDetail]:
+    def scrape_order_over_http(
+        self, href: str, output_dir: str = "order_details"
+    ) -> Optional[OrderDetail]:
         """
-        Main method to scrape all orders using Selenium.
-        Opens each order detail page in a new tab, scrapes, closes, and returns to main tab.
-        """
-        orders: List[OrderDetail] = []
-        view_links = self.get_order_view_buttons()
-        log.info(f"Found {len(view_links)} orders.")
-        # Collect all hrefs first
-        hrefs = []
-        for link in view_links:
-            href = link.get_attribute("href")
-            if href:
-                hrefs.append(href)
-        main_window = self.driver.current_window_handle
-        for href in hrefs:
-            # Open order detail in a new tab
-            self.driver.execute_script(f"window.open('{href}', '_blank');")
-            self.driver.switch_to.window(self.driver.window_handles[-1])
-            order_data = self.handle_order_detail_page()
-            if order_data:
-                orders.append(order_data)
-            self.driver.switch_to.window(main_window)
+        Scrape one order detail page with the login session alone, no browser.
+        Returns None when the page cannot be read this way (an error, a login
+        redirect, or no receipt to save as the order PDF).
+        """
+        if self.http is None:
+            return None
+        try:
+            resp = self.http.get(href, timeout=60)
+            resp.raise_for_status()
+            data = parse_order_page(resp.text, resp.url or href)
+        except Exception as e:
+            log.warning(f"Could not fetch order {href} over HTTP: {e}")
+            return None
+        if not data["order_number"]:
+            return None
+        return self._order_from_page(data, output_dir, in_browser=False)
+
+    def scrape_order(self, href: str) -> Optional[OrderDetail]:
+        """
+        Scrape one order detail page in the calling worker thread's browser.
+        """
+        self._ensure_worker_driver()
+        self.driver.get(href)
+        self._forget_page()
+        return self.handle_order_detail_page()
+
+    def scrape_order_batch(self, hrefs: list[str]) -> list[Optional[OrderDetail]]:
+        """
+        Scrape several order detail pages in the calling worker thread's browser.
+        The first ORDER_TABS pages are opened in new tabs in one script call so
+        they load in parallel. Each tab is then scraped and closed in turn, and
+        the next page is opened in a new tab first, keeping ORDER_TABS pages
+        loading until the batch runs out. Falls back to one page at a time if
+        the tabs could not be opened.
+        """
+        self._ensure_worker_driver()
+        driver = self.driver
+        # Every batch closes the tabs it opened, so the browser's own tab is
+        # the only one left between batches; look it up once per browser
+        home: Optional[str] = getattr(self._local, "home_window", None)
+        if home is None:
+            home = self._local.home_window = driver.current_window_handle
+        first = hrefs[:ORDER_TABS]
+        queued = deque(hrefs[ORDER_TABS:])
+        driver.execute_script(OPEN_TABS_JS, first)
+        tabs = deque(handle for handle in driver.window_handles if handle != home)
+        if len(tabs) != len(first):
+            log.warning("Could not open order tabs; loading orders one at a time.")
+            for tab in tabs:
+                driver.switch_to.window(tab)
+                driver.close()
+            driver.switch_to.window(home)
+            return [self.scrape_order(href) for href in hrefs]
+        orders = []
+        unopened = []
+        try:
+            while tabs:
+                tab = tabs.popleft()
+                driver.switch_to.window(tab)
+                self._block_requests(driver)
+                self._forget_page()
+                orders.append(self.handle_order_detail_page())
+                if queued:
+                    # Start the next page loading before this tab is closed
+                    href = queued.popleft()
+                    known = {home, tab, *tabs}
+                    driver.execute_script(OPEN_TABS_JS, [href])
+                    opened = [h for h in driver.window_handles if h not in known]
+                    if opened:
+                        tabs.append(opened[0])
+                    else:
+                        unopened.append(href)
+                driver.close()
+        finally:
+            driver.switch_to.window(home)
+            self._forget_page()
+        if unopened:
+            log.warning(f"Could not open {len(unopened)} order tabs; loading them.")
+            orders.extend(self.scrape_order(href) for href in unopened)
         return orders
 
+    def scrape_all_orders(self) -> Iterator[OrderDetail]:
+        """
+        Main method to scrape all orders using Selenium.
+        Collects the order links from the order history page and fetches the
+        order detail pages over HTTP with the login cookies, HTTP_WORKERS at a
+        time. Orders that cannot be read that way are spread over up to
+        max_browsers worker browsers, ORDER_BATCH orders at a time, each
+        browser keeping ORDER_TABS tabs loading. Orders are
+        yielded as they complete, in page order within each pass; orders
+        already in ORDERS_FILE are skipped.
+        """
+        # Collect all hrefs first, from one snapshot of the page
+        hrefs = [href for href in self.get_order_view_hrefs() if href]
+        log.info(f"Found {len(hrefs)} orders.")
+        # Drop repeated links, keeping page order, and orders scraped on an
+        # earlier run
+        hrefs = list(dict.fromkeys(hrefs))
+        done = load_scraped_order_urls(ORDERS_FILE)
+        todo = [href for href in hrefs if href not in done]
+        if len(todo) < len(hrefs):
+            log.info(f"Skipping {len(hrefs) - len(todo)} orders already scraped.")
+        hrefs = todo
+        if self.http is not None and hrefs:
+            with ThreadPoolExecutor(max_workers=HTTP_WORKERS) as executor:
+                fetched = executor.map(self.scrape_order_over_http, hrefs)
+                left = []
+                for href, order in zip(hrefs, fetched):
+                    if order:
+                        yield order
+                    else:
+                        left.append(href)
+            log.info(f"{len(hrefs) - len(left)} orders read over HTTP.")
+            hrefs = left
+        if not hrefs:
+            return
+        # Worker browsers reuse this browser's login rather than logging in again
+        self._login_cookies = list(self._main_driver.get_cookies())
+        with ThreadPoolExecutor(max_workers=self.max_browsers) as executor:
+            batches = []
+            for start in range(0, len(hrefs), ORDER_BATCH):
+                end = start + ORDER_BATCH
+                batches.append(hrefs[start:end])
+            for orders in executor.map(self.scrape_order_batch, batches):
+                yield from (order for order in orders if order)
+
     def close(self) -> None:
-        self.driver.quit()
+        for driver in self._worker_drivers:
+            driver.quit()
+        self._worker_drivers.clear()
+        for profile_dir in self._worker_profiles:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        self._worker_profiles.clear()
+        self._main_driver.quit()
 
 
 def main() -> None:
@@ -541,16 +1374,16 @@ def main() -> None:
     except Exception as e:
         log.error(f"Error loading credentials: {e}")
         raise
-    start_url = (
-        "https://www.thewinesociety.com/my-account/order-history/?page=1&months=19"
-        "&epmonths=6&isEnPrimeur=False"
-    )
-    scraper = WineSocietyOrderScraperSelenium(username, password, start_url)
+    scraper = WineSocietyOrderScraperSelenium(username, password, ORDER_HISTORY_URL)
     try:
         scraper.login()
-        orders = scraper.scrape_all_orders()
-        for order in orders:
-            log.info(order)
+        # Write each order as soon as it is scraped so a crash keeps the progress
+        os.makedirs(os.path.dirname(ORDERS_FILE), exist_ok=True)
+        with open(ORDERS_FILE, "a", encoding="utf-8") as f:
+            for order in scraper.scrape_all_orders():
+                log.info(order)
+                f.write(json.dumps(order.to_dict()) + "\n")
+                f.flush()
     finally:
         scraper.close()
 
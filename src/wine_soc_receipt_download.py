@@ -1,10 +1,20 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 
+import requests
+
+import atexit
 import os
-import time
+import shutil
+from glob import glob
+import queue
+import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,35 +23,27 @@ logging.basicConfig(
 )
 log = logging.getLogger("wine_soc_scraper")
 
+# Browsers kept open between downloads, and how many downloads one browser
+# serves before it is replaced to bound Chrome's memory growth
+POOL_SIZE = 4
+MAX_DRIVER_USES = 50
 
-def download_receipt_pdf_wine_society(
-    order_number: str, download_dir: str = "wine_society_receipts"
-) -> None:
-    """
-    Downloads a PDF receipt from The Wine Society for a given order number
-    by simulating a browser download.
-
-    This function uses Selenium to open a headless Chrome browser, constructs
-    the specific download URL for The Wine Society, navigates to it, and
-    triggers the download of the PDF, similar to how a user would in Chrome.
-    It configures Chrome to automatically download PDFs without opening them.
+RECEIPT_DOWNLOAD_URL = (
+    "https://www.thewinesociety.com/CustomFileDownload/DownloadInvoice"
+)
+# Read size when streaming a receipt to disk over HTTP
+COPY_CHUNK_SIZE = 64 * 1024
 
-    Args:
-        order_number (str): The specific order number (e.g., 'TWSWEB-13480088')
-                            which forms part of the download URL.
-        download_dir (str): The directory where the PDF should be saved.
-                            Defaults to 'wine_society_receipts' in the
-                            current working directory.
-    """
-    base_download_url = (
-        "https://www.thewinesociety.com/CustomFileDownload/DownloadInvoice"
-    )
-    receipt_url = f"{base_download_url}?orderNumber={order_number}"
+# Longest wait for a receipt download to finish, and how often to check on it
+DOWNLOAD_TIMEOUT = 15.0
+DOWNLOAD_POLL = 0.25
 
-    if not os.path.exists(download_dir):
-        os.makedirs(download_dir)
-        print(f"Created download directory: {download_dir}")
 
+def new_receipt_driver() -> webdriver.Chrome:
+    """
+    Start a headless Chrome configured to save PDFs rather than display them.
+    The download directory is set per download, see download_receipt_pdf_wine_society.
+    """
     # Configure Chrome options for headless mode and PDF download
     chrome_options = Options()
     chrome_options.add_argument("--headless")  # Run in headless mode (no UI)
@@ -56,21 +58,198 @@ def download_receipt_pdf_wine_society(
     chrome_options.add_experimental_option(
         "prefs",
         {
-            "download.default_directory": os.path.abspath(download_dir),
             "download.prompt_for_download": False,
             "download.directory_upgrade": True,
             "plugins.always_open_pdf_externally": True,  # Crucial for direct PDF download
         },
     )
-
-    # Initialize the WebDriver
     # IMPORTANT: Replace 'path/to/your/chromedriver.exe' with the actual path
     # or ensure chromedriver is in your system's PATH.
+    service = Service(
+        "chromedriver.exe"
+    )  # Assumes chromedriver.exe is in PATH or current dir
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+
+class BrowserPool:
+    """
+    Chrome sessions shared between downloads so each one is not paying for a
+    browser start. At most size browsers exist at once; acquire() blocks
+    while they are all in use.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        factory: Callable[[], webdriver.Chrome] = new_receipt_driver,
+        max_uses: int = MAX_DRIVER_USES,
+    ) -> None:
+        self.size = size
+        self.factory = factory
+        self.max_uses = max_uses
+        # One slot per browser that may exist; idle browsers wait in _idle
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: queue.LifoQueue[webdriver.Chrome] = queue.LifoQueue()
+        self._uses: dict[int, int] = {}
+        self._drivers: list[webdriver.Chrome] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> webdriver.Chrome:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            driver = self.factory()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._drivers.append(driver)
+            self._uses[id(driver)] = 0
+        return driver
+
+    def release(self, driver: webdriver.Chrome) -> None:
+        """
+        Hand a browser back, replacing it once it has served max_uses downloads
+        """
+        try:
+            with self._lock:
+                self._uses[id(driver)] += 1
+                worn_out = self._uses[id(driver)] >= self.max_uses
+            try:
+                if not worn_out:
+                    driver.delete_all_cookies()
+                    self._idle.put(driver)
+                    return
+            except Exception as e:
+                log.warning(f"Discarding broken browser: {e}")
+            # The next acquire() starts a fresh browser in its place
+            with self._lock:
+                self._drivers.remove(driver)
+                del self._uses[id(driver)]
+            try:
+                driver.quit()
+            except Exception as e:
+                log.warning(f"Error closing browser: {e}")
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+            self._uses.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                log.warning(f"Error closing browser: {e}")
+
+
+POOL = BrowserPool()
+atexit.register(POOL.close)
+
+
+def session_from_driver(driver: webdriver.Chrome) -> requests.Session:
+    """
+    Build a requests session carrying a logged-in browser's cookies, so
+    receipts can be fetched without a browser of their own
+    """
+    session = requests.Session()
+    for cookie in driver.get_cookies():
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path", "/"),
+        )
+    return session
+
+
+def download_receipt_pdf_requests(
+    session: requests.Session,
+    order_number: str,
+    download_dir: str = "wine_society_receipts",
+    timeout: float = DOWNLOAD_TIMEOUT,
+) -> Optional[str]:
+    """
+    Download a receipt PDF with a plain HTTP GET on a logged-in session.
+    Returns the saved path, or None if the response was not a PDF (for
+    example a login page because the session has expired).
+    """
+    receipt_url = f"{RECEIPT_DOWNLOAD_URL}?orderNumber={order_number}"
+    dest_path = os.path.join(download_dir, f"{order_number}.pdf")
+    # Stream to a partial file so a failed download never looks complete
+    part_path = f"{dest_path}.part"
+    try:
+        with session.get(receipt_url, timeout=timeout, stream=True) as resp:
+            resp.raise_for_status()
+            content_type = resp.headers.get("Content-Type", "")
+            if "pdf" not in content_type.lower():
+                log.warning(
+                    f"Receipt for {order_number} was {content_type or 'not a PDF'}"
+                )
+                return None
+            os.makedirs(download_dir, exist_ok=True)
+            # Undo any gzip/deflate transfer encoding while copying
+            resp.raw.decode_content = True
+            with open(part_path, "wb") as f:
+                shutil.copyfileobj(resp.raw, f, COPY_CHUNK_SIZE)
+        os.replace(part_path, dest_path)
+    except Exception as e:
+        log.warning(f"HTTP download of receipt {order_number} failed: {e}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return None
+    log.info(f"Receipt downloaded to {os.path.abspath(dest_path)}")
+    return dest_path
+
+
+def download_receipt_pdf_wine_society(
+    order_number: str,
+    download_dir: str = "wine_society_receipts",
+    session: Optional[requests.Session] = None,
+    browser_fallback: bool = True,
+) -> None:
+    """
+    Downloads a PDF receipt from The Wine Society for a given order number.
+
+    With a logged-in session the receipt is fetched over plain HTTP, see
+    download_receipt_pdf_requests. Otherwise, or if that fails and
+    browser_fallback is set, this function uses Selenium to drive a headless Chrome browser from POOL,
+    constructs the specific download URL for The Wine Society, navigates to it,
+    and triggers the download of the PDF, similar to how a user would in Chrome.
+    It configures Chrome to automatically download PDFs without opening them.
+
+    Args:
+        order_number (str): The specific order number (e.g., 'TWSWEB-13480088')
+                            which forms part of the download URL.
+        download_dir (str): The directory where the PDF should be saved.
+                            Defaults to 'wine_society_receipts' in the
+                            current working directory.
+        session (requests.Session): Optional logged-in session, e.g. from
+                            session_from_driver, to download without a browser.
+        browser_fallback (bool): Whether to fall back to a browser download
+                            when the session download fails.
+    """
+    if session is not None:
+        if download_receipt_pdf_requests(session, order_number, download_dir):
+            return
+        if not browser_fallback:
+            return
+
+    receipt_url = f"{RECEIPT_DOWNLOAD_URL}?orderNumber={order_number}"
+
+    if not os.path.exists(download_dir):
+        os.makedirs(download_dir)
+        print(f"Created download directory: {download_dir}")
+
+    # Take a browser from the pool
     try:
-        service = Service(
-            "chromedriver.exe"
-        )  # Assumes chromedriver.exe is in PATH or current dir
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver = POOL.acquire()
     except Exception as e:
         log.error(
             "Error initializing WebDriver. Make sure chromedriver is installed and in your PATH, "
@@ -83,25 +262,66 @@ def download_receipt_pdf_wine_society(
     print(f"Navigating to URL: {receipt_url}")
 
     try:
-        # use Chrome settings to download the PDF to the default download directory
-        # then we move this to the correct folder?
+        # Pooled browsers are shared between callers, so point this one's
+        # downloads at the requested directory
+        driver.execute_cdp_cmd(
+            "Browser.setDownloadBehavior",
+            {"behavior": "allow", "downloadPath": os.path.abspath(download_dir)},
+        )
+        # Receipts are saved as <order number>*.pdf; note any already there
+        pattern = os.path.join(download_dir, f"{order_number}*.pdf")
+        before = set(glob(pattern))
         driver.get(receipt_url)
 
         log.info(
             "Waiting for download to initiate and complete... (this might take a few seconds)"
         )
-        time.sleep(1)  # Increased sleep slightly as a precaution. Adjust as needed.
 
-        # Optional: You could add logic here to list files in download_dir
-        # and check if a new PDF has appeared with a relevant filename.
-        # This would require more sophisticated file system monitoring.
+        # Done once a new PDF for this order is there and Chrome has no
+        # partial download left in the directory
+        def downloaded(_: webdriver.Chrome) -> bool:
+            return bool(set(glob(pattern)) - before) and not glob(
+                os.path.join(download_dir, "*.crdownload")
+            )
 
-        log.info(
-            f"Download triggered. Check directory: {os.path.abspath(download_dir)}"
-        )
+        try:
+            WebDriverWait(driver, DOWNLOAD_TIMEOUT, DOWNLOAD_POLL).until(downloaded)
+            log.info(f"Receipt downloaded to {os.path.abspath(download_dir)}")
+        except TimeoutException:
+            log.warning(
+                f"Download triggered, but no receipt PDF appeared within "
+                f"{DOWNLOAD_TIMEOUT}s. Check directory: {os.path.abspath(download_dir)}"
+            )
 
     except Exception as e:
         print(f"An error occurred during download: {e}")
+    finally:
+        POOL.release(driver)
+
+
+def download_receipts_bulk(
+    order_numbers: list[str],
+    download_dir: str = "wine_society_receipts",
+    workers: int = POOL_SIZE,
+    session: Optional[requests.Session] = None,
+) -> None:
+    """
+    Download the receipts for several orders at once. Each worker thread
+    holds its own pooled browser for the length of a download, so no browser
+    is ever shared between threads; more workers than POOL_SIZE only queue.
+    With a session, browsers are only used for receipts it cannot fetch.
+    """
+    # Create the directory up front rather than racing to in every worker
+    os.makedirs(download_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(
+            executor.map(
+                lambda order_number: download_receipt_pdf_wine_society(
+                    order_number, download_dir, session
+                ),
+                order_numbers,
+            )
+        )
 
 
 # --- How to use it ---
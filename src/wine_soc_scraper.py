@@ -1,8 +1,8 @@
 import os
 import requests
-from bs4 import BeautifulSoup
+import lxml.html
+from urllib.parse import urljoin
 from dotenv import load_dotenv
-from bs4.element import Tag
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "raw")
 PDF_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Data", "pdfs")
@@ -19,19 +19,18 @@ ORDER_HISTORY_URL = "https://www.thewinesociety.com/my-account/order-history/?pa
 def login(session: requests.Session, email: str, password: str) -> bool:
     # Get login page (to get cookies and any hidden fields)
     resp = session.get(LOGIN_URL)
-    soup = BeautifulSoup(resp.text, "html.parser")
+    tree = lxml.html.fromstring(resp.text)
     # Find hidden fields (e.g., __RequestVerificationToken)
     login_data = {
         "Email": email,
         "Password": password,
     }
     # Add hidden fields if present
-    for inp in soup.find_all("input", type="hidden"):
-        if isinstance(inp, Tag):
-            name = inp.attrs.get("name")
-            value = inp.attrs.get("value")
-            if name and value:
-                login_data[str(name)] = str(value)
+    for inp in tree.xpath("//input[@type='hidden'][@name][@value]"):
+        name = inp.get("name")
+        value = inp.get("value")
+        if name and value:
+            login_data[name] = value
     # Post login
     resp = session.post(LOGIN_URL, data=login_data)
     if "logout" not in resp.text.lower():
@@ -43,15 +42,10 @@ def login(session: requests.Session, email: str, password: str) -> bool:
 
 def fetch_order_links(session: requests.Session) -> list[str]:
     resp = session.get(ORDER_HISTORY_URL)
-    soup = BeautifulSoup(resp.text, "html.parser")
-    order_links = []
-    for a in soup.find_all("a", href=True):
-        if isinstance(a, Tag):
-            href = a.get("href")
-            if href and "/my-account/order-details/" in str(href):
-                full_url = "https://www.thewinesociety.com" + str(href)
-                order_links.append(full_url)
-    return order_links
+    # Only the order links' hrefs are needed, read straight off lxml's tree
+    tree = lxml.html.fromstring(resp.text)
+    hrefs = tree.xpath("//a[contains(@href, '/my-account/order-details/')]/@href")
+    return [urljoin(ORDER_HISTORY_URL, str(href)) for href in hrefs]
 
 
 def main() -> None:
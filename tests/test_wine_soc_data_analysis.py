@@ -0,0 +1,91 @@
+"""Tests for the wine data loading, cleaning and caching helpers."""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from src import wine_soc_data_analysis as wda
+
+CSV_TEXT = (
+    "#Download date: 06/26/2025\n"
+    "Product name,Product code,Purchase date,Purchase price,Drink date\n"
+    "Blanquette de Limoux Reserve 2015,SG2421,03/07/2019,9.95,2017 - 2021\n"
+    "Ch Moncets Lalande de Pomerol 2011,CS9391,03/07/2019,12.95,2015 - 2020\n"
+    ",SE99,08/09/2017,40.00,\n"
+)
+
+
+@pytest.fixture
+def wine_csv(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    csv_path = tmp_path / "wines.csv"
+    csv_path.write_text(CSV_TEXT, encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(wda, "CSV_FILE", str(csv_path))
+    monkeypatch.setattr(wda, "CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(wda, "CACHE_FILE", str(cache_dir / "clean.arrow"))
+    monkeypatch.setattr(wda, "CACHE_META_FILE", str(cache_dir / "clean.json"))
+    monkeypatch.delenv(wda.REFRESH_CACHE_ENV, raising=False)
+    return csv_path
+
+
+def test_load_clean_wine_data_writes_and_reuses_cache(
+    wine_csv: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    first = wda.load_clean_wine_data()
+    assert os.path.exists(wda.CACHE_FILE)
+    assert len(first) == 2
+
+    def fail_clean(df: pd.DataFrame) -> pd.DataFrame:
+        raise AssertionError("cache should have been used")
+
+    monkeypatch.setattr(wda, "clean_wine_data", fail_clean)
+    cached = wda.load_clean_wine_data()
+    assert cached["Product code"].tolist() == first["Product code"].tolist()
+    assert cached["Wine_Type"].tolist() == ["Sparkling", "Côtes de Saint-Emilion"]
+
+
+def test_cached_data_has_the_cleaned_dtypes(wine_csv: Path) -> None:
+    fresh = wda.load_clean_wine_data()
+    cached = wda.load_clean_wine_data()
+    assert cached.dtypes.to_dict() == fresh.dtypes.to_dict()
+    # Category equality ignores the categories' own dtype, so compare it too
+    for column in fresh.select_dtypes("category"):
+        assert cached[column].cat.categories.dtype == fresh[column].cat.categories.dtype
+    pd.testing.assert_frame_equal(cached, fresh)
+
+
+def test_load_clean_wine_data_rebuilds_when_csv_changes(wine_csv: Path) -> None:
+    wda.load_clean_wine_data()
+    wine_csv.write_text(
+        CSV_TEXT + "Rioja Reserva 2018,SP1234,01/02/2020,15.50,2022 - 2026\n",
+        encoding="utf-8",
+    )
+    assert len(wda.load_clean_wine_data()) == 3
+
+
+def test_data_version_changes_with_the_csv(wine_csv: Path) -> None:
+    before = wda.data_version()
+    assert before == wda.data_version()
+    wine_csv.write_text(
+        CSV_TEXT + "Rioja Reserva 2018,SP1234,01/02/2020,15.50,2022 - 2026\n",
+        encoding="utf-8",
+    )
+    assert wda.data_version() != before
+
+
+def test_load_summary_totals_reads_cache_sidecar(
+    wine_csv: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    df_clean = wda.load_clean_wine_data()
+    expected = wda.summary_totals(df_clean)
+
+    def fail_totals(df: pd.DataFrame) -> dict:
+        raise AssertionError("sidecar totals should have been used")
+
+    monkeypatch.setattr(wda, "summary_totals", fail_totals)
+    totals = wda.load_summary_totals(df_clean)
+    assert totals["total_purchases"] == expected["total_purchases"] == 2
+    assert totals["total_spent"] == pytest.approx(expected["total_spent"])
+    assert totals["avg_price"] == pytest.approx(expected["avg_price"])
+    assert totals["date_range"] == expected["date_range"]
@@ -0,0 +1,106 @@
+"""Tests for the requests-based WineSocietyOrderScraper."""
+
+import io
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+from src import wine_soc_order_scraper as wsos
+from src.wine_soc_order_scraper import WineSocietyOrderScraper
+
+ORDERS_HTML = """
+<html><body>
+  <a href="/my-account/orders/1">View</a>
+  <a href="https://www.thewinesociety.com/my-account/orders/2">View</a>
+  <a href="/my-account/orders/3">View</a>
+</body></html>
+"""
+
+
+@pytest.fixture(autouse=True)
+def dead_url_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(wsos, "DEAD_URL_CACHE_FILE", str(tmp_path / "dead_urls"))
+
+
+def make_session(statuses: dict | None = None) -> MagicMock:
+    def get(url: str) -> MagicMock:
+        resp = MagicMock()
+        resp.text = ORDERS_HTML
+        resp.status_code = (statuses or {}).get(url, 200)
+        return resp
+
+    session = MagicMock()
+    session.get.side_effect = get
+    return session
+
+
+def test_scrape_all_orders_keeps_page_order() -> None:
+    session = make_session()
+    scraper = WineSocietyOrderScraper(
+        "https://www.thewinesociety.com/my-account/orders", session=session
+    )
+    orders = scraper.scrape_all_orders()
+    assert [o["url"] for o in orders] == [
+        "https://www.thewinesociety.com/my-account/orders/1",
+        "https://www.thewinesociety.com/my-account/orders/2",
+        "https://www.thewinesociety.com/my-account/orders/3",
+    ]
+    assert session.get.call_count == 4
+
+
+def test_scrape_order_detail_skips_dead_urls() -> None:
+    dead = "https://www.thewinesociety.com/my-account/orders/2"
+    session = make_session({dead: 404})
+    scraper = WineSocietyOrderScraper(
+        "https://www.thewinesociety.com/my-account/orders", session=session
+    )
+    assert scraper.scrape_order_detail(dead) == {
+        "url": dead,
+        "data": None,
+        "status": 404,
+    }
+    assert scraper.scrape_order_detail(dead)["status"] == 404
+    assert session.get.call_count == 1
+
+
+def test_find_order_links_returns_absolute_urls() -> None:
+    scraper = WineSocietyOrderScraper(
+        "https://www.thewinesociety.com/my-account/orders", session=make_session()
+    )
+    soup = BeautifulSoup(
+        '<a href="/orders/1"> View </a><button>View</button>'
+        '<a href="/orders/2">Print</a><a>View</a>',
+        "lxml",
+    )
+    assert scraper.find_order_links(soup) == ["https://www.thewinesociety.com/orders/1"]
+
+
+def test_orders_page_is_fetched_every_time_but_order_pages_are_cached(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(wsos, "HTTP_CACHE_FILE", str(tmp_path / "http_cache.sqlite"))
+    start_url = "https://www.thewinesociety.com/my-account/orders?page=1"
+    order_url = "https://www.thewinesociety.com/my-account/orders/1"
+    sent: list[str] = []
+
+    class SiteAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):  # type: ignore[no-untyped-def]
+            sent.append(request.url)
+            raw = HTTPResponse(
+                body=io.BytesIO(ORDERS_HTML.encode()),
+                status=200,
+                headers={"Content-Type": "text/html"},
+                preload_content=False,
+                request_url=request.url,
+            )
+            return self.build_response(request, raw)
+
+    scraper = WineSocietyOrderScraper(start_url)
+    scraper.session.mount("https://", SiteAdapter())
+    for _ in range(2):
+        scraper.get_orders_page()
+        scraper.session.get(order_url)
+    assert sent == [start_url, order_url, start_url]
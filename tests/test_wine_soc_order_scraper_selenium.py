@@ -1,12 +1,32 @@
 """Tests for WineSocietyOrderScraperSelenium and OrderDetail."""
 
+import base64
+import io
+import threading
+from collections.abc import Iterable
+from pathlib import Path
 from unittest.mock import patch, MagicMock, PropertyMock
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from src import wine_soc_order_scraper_selenium as wsos
 from src.wine_soc_order_scraper_selenium import (
     WineSocietyOrderScraperSelenium,
     OrderDetail,
 )
 
 
+def orders_page(numbers: Iterable[int]) -> list[str]:
+    """
+    Page snapshot as returned by the DOM script: outer HTML and page URL
+    """
+    links = "".join(
+        f'<a class="btn" href="/order/{n}"> View </a><a href="/order/{n}">Print</a>'
+        for n in numbers
+    )
+    return [f"<html><body>{links}</body></html>", "https://example.com/orders"]
+
+
 def test_order_detail_to_dict() -> None:
     od = OrderDetail(
         order_number="12345",
@@ -26,6 +46,22 @@ def test_order_detail_to_dict() -> None:
     assert d["receipts"] == ["receipt.pdf"]
     assert d["wine_notes"] == ["note.pdf"]
     assert d["wine_links"] == ["https://example.com/wine1"]
+    assert set(d) == {
+        "order_number",
+        "order_date",
+        "order_total",
+        "url",
+        "pdf_path",
+        "receipts",
+        "wine_notes",
+        "wine_links",
+    }
+    assert not hasattr(od, "__dict__")
+    # Lists are shared unless a copy is asked for
+    assert d["wine_links"] is od.wine_links
+    copied = od.to_dict(copy=True)
+    assert copied == d
+    assert copied["wine_links"] is not od.wine_links
 
 
 @patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
@@ -38,28 +74,826 @@ def test_scraper_instantiation(mock_chrome: MagicMock) -> None:
 
 
 @patch.object(WineSocietyOrderScraperSelenium, "save_order_page_as_pdf")
-@patch.object(WineSocietyOrderScraperSelenium, "download_receipt_and_notes")
-@patch.object(WineSocietyOrderScraperSelenium, "follow_wine_links")
-@patch.object(WineSocietyOrderScraperSelenium, "driver", create=True)
+@patch.object(WineSocietyOrderScraperSelenium, "download_order_pdfs")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
 def test_handle_order_detail_page_mocks(
-    mock_driver: MagicMock,
-    mock_follow: MagicMock,
+    mock_chrome: MagicMock,
     mock_download: MagicMock,
     mock_save: MagicMock,
 ) -> None:
     scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
-    # Patch Selenium find_element and find_elements to return MagicMock with .text and .get_attribute
-    fake_elem = MagicMock()
-    fake_elem.text = "Order No: 12345"
-    fake_elem.find_element.return_value.text = "2024-06-01"
-    fake_elem.find_element().text = "2024-06-01"
-    type(scraper.driver).find_element = MagicMock(return_value=fake_elem)
-    type(scraper.driver).find_elements = MagicMock(return_value=[])
-    with patch.object(
-        type(scraper.driver), "current_url", new_callable=PropertyMock
-    ) as mock_url:
-        mock_url.return_value = "https://example.com/order/12345"
-        result = scraper.handle_order_detail_page(output_dir="/tmp")
-        assert isinstance(result, OrderDetail)
-        assert result.order_number == "12345"
+    scraper._cookies_accepted = True
+    # The page script finds the order number and date but reports no URL
+    scraper.driver.execute_script.return_value = {
+        "order_number": "Order No: 12345",
+        "columns": {"Date placed": "2024-06-01"},
+    }
+    scraper.driver.current_url = "https://example.com/order/12345"
+    result = scraper.handle_order_detail_page(output_dir="/tmp")
+    assert isinstance(result, OrderDetail)
+    assert result.order_number == "12345"
+    assert result.order_date == "2024-06-01"
+    # The browser's URL stands in for the one the script did not report
+    assert result.url == "https://example.com/order/12345"
+    mock_save.assert_called_once()
+    mock_download.assert_called_once_with([], [], browser_fallback=True)
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "login")
+@patch.object(WineSocietyOrderScraperSelenium, "handle_order_detail_page")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_scrape_all_orders_uses_worker_browsers(
+    mock_chrome: MagicMock,
+    mock_handle: MagicMock,
+    mock_login: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(wsos, "ORDERS_FILE", str(tmp_path / "orders.jsonl"))
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url", max_browsers=2)
+    scraper._main_driver.execute_script.return_value = orders_page(range(5))
+    mock_handle.side_effect = lambda: OrderDetail(
+        order_number=None,
+        order_date=None,
+        order_total=None,
+        url="",
+        pdf_path=None,
+        receipts=[],
+        wine_notes=[],
+        wine_links=[],
+    )
+    orders = list(scraper.scrape_all_orders())
+    assert len(orders) == 5
+    # One main browser plus at most one per worker, each logged in once
+    assert 2 <= mock_chrome.call_count <= 3
+    assert mock_login.call_count == mock_chrome.call_count - 1
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "handle_order_detail_page")
+@patch.object(WineSocietyOrderScraperSelenium, "login")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_worker_browsers_reuse_login_cookies(
+    mock_chrome: MagicMock,
+    mock_login: MagicMock,
+    mock_handle: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(wsos, "ORDERS_FILE", str(tmp_path / "orders.jsonl"))
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url", max_browsers=2)
+    browser = mock_chrome.return_value
+    browser.execute_script.return_value = orders_page(range(4))
+    browser.get_cookies.return_value = [{"name": "session", "value": "abc"}]
+    mock_handle.return_value = None
+    list(scraper.scrape_all_orders())
+    mock_login.assert_not_called()
+    workers = mock_chrome.call_count - 1
+    assert workers >= 1
+    browser.add_cookie.assert_called_with({"name": "session", "value": "abc"})
+    assert browser.add_cookie.call_count == workers
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "scrape_order_batch")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_scrape_all_orders_skips_repeated_and_scraped_orders(
+    mock_chrome: MagicMock,
+    mock_scrape: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    orders_file = tmp_path / "orders.jsonl"
+    orders_file.write_text(
+        '{"url": "https://example.com/order/1"}\n{"url": "https://exa', encoding="utf-8"
+    )
+    monkeypatch.setattr(wsos, "ORDERS_FILE", str(orders_file))
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    scraper._main_driver.execute_script.return_value = orders_page([1, 2, 2, 3])
+    mock_scrape.side_effect = lambda hrefs: [None] * len(hrefs)
+    list(scraper.scrape_all_orders())
+    assert sorted(h for c in mock_scrape.call_args_list for h in c.args[0]) == [
+        "https://example.com/order/2",
+        "https://example.com/order/3",
+    ]
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "handle_order_detail_page")
+@patch.object(WineSocietyOrderScraperSelenium, "login")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_scrape_order_batch_opens_orders_in_tabs(
+    mock_chrome: MagicMock, mock_login: MagicMock, mock_handle: MagicMock
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    browser = mock_chrome.return_value
+    browser.current_window_handle = "home"
+    window_handles = PropertyMock(
+        side_effect=[["home", "tab1", "tab2"], ["home", "tab3"]]
+    )
+    type(browser).window_handles = window_handles
+    mock_handle.side_effect = ["order1", "order2", "order3"]
+    hrefs = ["https://example.com/order/1", "https://example.com/order/2"]
+    assert scraper.scrape_order_batch(hrefs) == ["order1", "order2"]
+    browser.execute_script.assert_called_once_with(wsos.OPEN_TABS_JS, hrefs)
+    browser.get.assert_not_called()
+    assert [c.args[0] for c in browser.switch_to.window.call_args_list] == [
+        "tab1",
+        "tab2",
+        "home",
+    ]
+    assert browser.close.call_count == 2
+    # The next batch reads the tab list once and reuses the known home tab
+    assert scraper.scrape_order_batch(["https://example.com/order/3"]) == ["order3"]
+    assert window_handles.call_count == 2
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "handle_order_detail_page")
+@patch.object(WineSocietyOrderScraperSelenium, "login")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_order_tabs_block_images_fonts_and_trackers(
+    mock_chrome: MagicMock, mock_login: MagicMock, mock_handle: MagicMock
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    browser = mock_chrome.return_value
+    browser.current_window_handle = "home"
+    type(browser).window_handles = PropertyMock(return_value=["home", "tab1", "tab2"])
+    # The worker browser blocks requests in its own first tab when it starts
+    scraper._ensure_worker_driver()
+    events: list[tuple] = []
+    browser.switch_to.window.side_effect = lambda h: events.append(("switch", h))
+    browser.execute_cdp_cmd.side_effect = lambda cmd, params: events.append((cmd,))
+    mock_handle.side_effect = lambda: events.append(("read",))
+    hrefs = ["https://example.com/order/1", "https://example.com/order/2"]
+    scraper.scrape_order_batch(hrefs)
+    browser.execute_script.assert_called_once_with(wsos.OPEN_TABS_JS, hrefs)
+    # Each tab opened by the script gets its own blocked URLs before it is read
+    block = [("Network.enable",), ("Network.setBlockedURLs",)]
+    assert events == [
+        ("switch", "tab1"),
+        *block,
+        ("read",),
+        ("switch", "tab2"),
+        *block,
+        ("read",),
+        ("switch", "home"),
+    ]
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "handle_order_detail_page")
+@patch.object(WineSocietyOrderScraperSelenium, "login")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_scrape_order_batch_keeps_tabs_loading(
+    mock_chrome: MagicMock,
+    mock_login: MagicMock,
+    mock_handle: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(wsos, "ORDER_TABS", 2)
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    browser = mock_chrome.return_value
+    browser.current_window_handle = "home"
+    handles = ["home"]
+    current: list[str] = []
+
+    def open_tabs(script: str, urls: list[str]) -> None:
+        handles.extend(f"tab{url[-1]}" for url in urls)
+
+    def close() -> None:
+        handles.remove(current[-1])
+
+    browser.execute_script.side_effect = open_tabs
+    browser.close.side_effect = close
+    browser.switch_to.window.side_effect = current.append
+    type(browser).window_handles = PropertyMock(side_effect=lambda: list(handles))
+    mock_handle.side_effect = lambda: f"order{current[-1][-1]}"
+    hrefs = [f"https://example.com/order/{n}" for n in range(1, 6)]
+    assert scraper.scrape_order_batch(hrefs) == [f"order{n}" for n in range(1, 6)]
+    # Two tabs at first, then each closed tab's place taken by the next order
+    assert browser.execute_script.call_args_list[0].args[1] == hrefs[:2]
+    assert [c.args[1] for c in browser.execute_script.call_args_list[1:]] == [
+        [href] for href in hrefs[2:]
+    ]
+    assert handles == ["home"]
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "save_order_page_as_pdf")
+@patch.object(WineSocietyOrderScraperSelenium, "_download_with_page_fetches")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_handle_order_detail_page_reads_page_in_one_script(
+    mock_chrome: MagicMock,
+    mock_page_fetches: MagicMock,
+    mock_save: MagicMock,
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    mock_page_fetches.side_effect = lambda tasks: [True] * len(tasks)
+
+    # No cookie banner on the page
+    def find_element(by: str, value: str) -> MagicMock:
+        if value == "onetrust-accept-btn-handler":
+            raise NoSuchElementException()
+        return MagicMock()
+
+    scraper.driver.find_element.side_effect = find_element
+    scraper.driver.execute_script.return_value = {
+        "url": "https://example.com/order/12345",
+        "order_number": "Order No: 12345",
+        "columns": {"Date placed": "01/06/2024", "Order total": "£100.00"},
+        "receipts": ["https://example.com/receipt?orderNumber=TWSWEB-12345"],
+        "wine_notes": ["https://example.com/notes?orderNumber=TWSWEB-12345"],
+        "wine_links": ["https://example.com/product/wine1"],
+    }
+    result = scraper.handle_order_detail_page(output_dir="/tmp")
+    assert result is not None
+    assert result.order_number == "12345"
+    assert result.order_date == "01/06/2024"
+    assert result.order_total == "£100.00"
+    assert result.url == "https://example.com/order/12345"
+    assert result.wine_links == ["https://example.com/product/wine1"]
+    # The script itself is the wait for the order number: one round trip
+    assert scraper.driver.execute_script.call_count == 1
+    assert scraper.driver.execute_script.call_args.args[1] == wsos.ORDER_NUMBER_XPATH
+    assert all(
+        wsos.ORDER_NUMBER_XPATH not in c.args
+        for c in scraper.driver.find_element.call_args_list
+    )
+    # Without an HTTP session both PDFs are fetched by the page, in one script
+    mock_page_fetches.assert_called_once()
+    assert [url for url, _ in mock_page_fetches.call_args.args[0]] == [
+        "https://example.com/receipt?orderNumber=TWSWEB-12345",
+        "https://example.com/notes?orderNumber=TWSWEB-12345",
+    ]
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "_download_with_navigation")
+@patch.object(WineSocietyOrderScraperSelenium, "_download_with_page_fetches")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_download_order_pdfs_uses_http_session(
+    mock_chrome: MagicMock,
+    mock_page_fetches: MagicMock,
+    mock_navigation: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    receipt_url = "https://example.com/receipt?orderNumber=TWSWEB-12345"
+    notes_url = "https://example.com/notes?orderNumber=TWSWEB-12345"
+
+    def get(url: str, timeout: int, stream: bool) -> MagicMock:
+        resp = MagicMock()
+        resp.headers = {
+            "Content-Type": "application/pdf" if url == receipt_url else "text/html"
+        }
+        resp.raw = io.BytesIO(b"%PDF-1.4")
+        return resp
+
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    scraper.http = MagicMock()
+    scraper.http.get.side_effect = get
+    mock_page_fetches.return_value = [False]
+    scraper.download_order_pdfs([receipt_url], [notes_url])
+    saved = tmp_path / "Data" / "receipts" / "receipt_12345.pdf"
+    assert saved.read_bytes() == b"%PDF-1.4"
+    assert not list(saved.parent.glob("*.part"))
+    # The notes response was not a PDF, so the browser download is used instead:
+    # a page fetch first, then navigating to it when that fails too
+    mock_page_fetches.assert_called_once_with(
+        [(notes_url, str(Path("Data") / "wine_notes" / "wine_notes_12345.pdf"))]
+    )
+    mock_navigation.assert_called_once()
+    assert mock_navigation.call_args.args[0] == notes_url
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "_download_with_session")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_http_workers_download_pdfs_on_their_own_thread(
+    mock_chrome: MagicMock, mock_session_download: MagicMock
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    mock_chrome.return_value.get_cookies.return_value = []
+    session = scraper._session_from_driver()
+    adapter = session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == wsos.HTTP_WORKERS
+    assert adapter._pool_block
+    threads: list[int] = []
+
+    def download(url: str, path: str) -> bool:
+        threads.append(threading.get_ident())
+        return True
+
+    mock_session_download.side_effect = download
+    links = [f"https://example.com/receipt?orderNumber=TWSWEB-{n}" for n in range(3)]
+    with patch.object(wsos, "ThreadPoolExecutor") as executor:
+        scraper.download_order_pdfs(links, [], browser_fallback=False)
+    # No pool of its own inside an HTTP worker: the downloads run in turn
+    executor.assert_not_called()
+    assert threads == [threading.get_ident()] * 3
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "save_order_page_as_pdf")
+@patch.object(WineSocietyOrderScraperSelenium, "download_order_pdfs")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_cookie_banner_is_only_handled_once(
+    mock_chrome: MagicMock, mock_downloads: MagicMock, mock_save: MagicMock
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    banner = MagicMock()
+    # Visible when checked, then gone once clicked
+    banner.is_displayed.side_effect = [True, False]
+    scraper.driver.find_element.return_value = banner
+    scraper.driver.execute_script.return_value = {"order_number": "Order No: 1"}
+    scraper.handle_order_detail_page(output_dir="/tmp")
+    scraper.handle_order_detail_page(output_dir="/tmp")
+    banner.click.assert_called_once()
+    banner_lookups = [
+        c
+        for c in scraper.driver.find_element.call_args_list
+        if "onetrust-accept-btn-handler" in c.args
+    ]
+    assert len(banner_lookups) == 1
+    scraper.close()
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_save_order_page_as_pdf_prefers_receipt_download(
+    mock_chrome: MagicMock, tmp_path: Path
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    scraper.http = MagicMock()
+    scraper.http.get.return_value.headers = {"Content-Type": "application/pdf"}
+    scraper.http.get.return_value.raw = io.BytesIO(b"%PDF-1.4")
+    output_path = tmp_path / "12345.pdf"
+    # Image blocking is set up when the browser starts
+    scraper.driver.execute_cdp_cmd.reset_mock()
+    scraper.save_order_page_as_pdf(str(output_path), "https://example.com/receipt")
+    assert output_path.read_bytes() == b"%PDF-1.4"
+    scraper.driver.execute_cdp_cmd.assert_not_called()
+
+    # Without a receipt the page is printed and read back as a stream
+    chunks = iter(
+        [
+            {"data": "JVBERg==", "base64Encoded": True, "eof": False},
+            {"data": "LTEuNA==", "base64Encoded": True, "eof": True},
+        ]
+    )
+
+    def cdp(cmd: str, params: dict) -> dict:
+        if cmd == "Page.printToPDF":
+            return {"stream": "pdf-stream"}
+        if cmd == "IO.read":
+            return next(chunks)
+        return {}
+
+    scraper.driver.execute_cdp_cmd.side_effect = cdp
+    scraper.save_order_page_as_pdf(str(output_path))
+    assert output_path.read_bytes() == b"%PDF-1.4"
+    scraper.driver.execute_cdp_cmd.assert_called_with(
+        "IO.close", {"handle": "pdf-stream"}
+    )
+    scraper.close()
+
+
+def test_wait_for_download_waits_for_new_finished_pdf(tmp_path: Path) -> None:
+    old = tmp_path / "TWSWEB-1-old.pdf"
+    old.write_bytes(b"%PDF")
+    pattern = str(tmp_path / "TWSWEB-1*.pdf")
+    before = {str(old)}
+    assert wsos.wait_for_download(pattern, before, timeout=0) is None
+    new = tmp_path / "TWSWEB-1.pdf"
+    new.write_bytes(b"%PDF")
+    partial = tmp_path / "Unconfirmed 42.crdownload"
+    partial.write_bytes(b"")
+    assert wsos.wait_for_download(pattern, before, timeout=0) is None
+    partial.unlink()
+    assert wsos.wait_for_download(pattern, before, timeout=0) == str(new)
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_browser_is_headless_eager_and_skips_images(mock_chrome: MagicMock) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    options = mock_chrome.call_args.kwargs["options"]
+    assert "--headless=new" in options.arguments
+    assert "--blink-settings=imagesEnabled=false" in options.arguments
+    assert options.page_load_strategy == "eager"
+    prefs = options.experimental_options["prefs"]
+    assert prefs["profile.managed_default_content_settings.images"] == 2
+    mock_chrome.return_value.implicitly_wait.assert_called_once_with(0)
+    scraper.close()
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_browser_can_be_shown_for_debugging(mock_chrome: MagicMock) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url", headless=False)
+    options = mock_chrome.call_args.kwargs["options"]
+    assert "--headless=new" not in options.arguments
+    assert "--start-maximized" in options.arguments
+    # Fonts are blocked along with images either way
+    scraper.driver.execute_cdp_cmd.assert_any_call(
+        "Network.setBlockedURLs", {"urls": wsos.BLOCKED_URL_PATTERNS}
+    )
+    assert "*.woff2" in wsos.BLOCKED_URL_PATTERNS
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "save_order_page_as_pdf")
+@patch.object(WineSocietyOrderScraperSelenium, "download_order_pdfs")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_copied_consent_cookie_skips_cookie_banner(
+    mock_chrome: MagicMock,
+    mock_downloads: MagicMock,
+    mock_save: MagicMock,
+    tmp_path: Path,
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    scraper._login_cookies = [
+        {"name": "session", "value": "abc"},
+        {"name": wsos.COOKIE_CONSENT_COOKIE, "value": "2025-01-01"},
+    ]
+    scraper._ensure_worker_driver()
+    assert scraper._cookies_accepted
+    scraper.driver.find_element.reset_mock()
+    scraper.driver.execute_script.return_value = {"order_number": "Order No: 1"}
+    scraper.handle_order_detail_page(output_dir=str(tmp_path))
+    assert all(
+        "onetrust-accept-btn-handler" not in c.args
+        for c in scraper.driver.find_element.call_args_list
+    )
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "download_wine_notes_pdf")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_wine_notes_url_is_resolved_against_the_page(
+    mock_chrome: MagicMock, mock_notes: MagicMock
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    toolbar = (
+        '<div class="order-toolbar__group--pull-right order-toolbar__actions">'
+        "<button onclick=\"DownloadWineNotesPdf(); location.href='{}'\">"
+        "Wine notes</button></div>"
+    )
+    for onclick, expected in [
+        ("/notes?x=1", "https://example.com/notes?x=1"),
+        ("//cdn.example.com/notes", "https://cdn.example.com/notes"),
+        ("notes", "https://example.com/order/notes"),
+    ]:
+        scraper._forget_page()
+        scraper.driver.execute_script.return_value = [
+            toolbar.format(onclick),
+            "https://example.com/order/1",
+        ]
+        scraper.driver.execute_script.reset_mock()
+        assert scraper.download_wine_notes_from_order_page() == expected
+        mock_notes.assert_called_with(expected, wsos.DOWNLOAD_TIMEOUT)
+        # A second look at the same page reuses the snapshot
+        assert scraper.download_wine_notes_from_order_page() == expected
+        scraper.driver.execute_script.assert_called_once()
+    scraper.close()
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_follow_wine_links_reads_hrefs_in_one_script(mock_chrome: MagicMock) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    links = ["https://example.com/product/wine1", "https://example.com/product/wine2"]
+    scraper.driver.execute_script.return_value = links
+    assert scraper.follow_wine_links() == links
+    assert scraper.follow_wine_links() == links
+    scraper.driver.execute_script.assert_called_once_with(
+        wsos.PRODUCT_LINKS_JS, wsos.PRODUCT_LINK_CSS
+    )
+    scraper.driver.find_elements.assert_not_called()
+    scraper.close()
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_browser_download_fetches_pdf_in_page_first(
+    mock_chrome: MagicMock, tmp_path: Path
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    url = "https://example.com/receipt?orderNumber=TWSWEB-12345"
+    dest_path = tmp_path / "receipt_12345.pdf"
+    scraper.driver.execute_async_script.return_value = [{"data": "JVBERi0xLjQ="}]
+    saved = scraper._download_with_browser(url, str(dest_path), "receipt", 0)
+    assert saved == str(dest_path)
+    assert dest_path.read_bytes() == b"%PDF-1.4"
+    scraper.driver.execute_async_script.assert_called_once_with(
+        wsos.FETCH_PDFS_JS, [url]
+    )
+    scraper.driver.get.assert_not_called()
+
+    # A failed page fetch falls back to navigating to the download
+    scraper.driver.execute_async_script.return_value = [{"error": "403 text/html"}]
+    assert scraper._download_with_browser(url, str(dest_path), "receipt", 0) is None
+    scraper.driver.get.assert_called_once_with(url)
+    scraper.close()
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_login_skips_form_when_profile_is_still_logged_in(
+    mock_chrome: MagicMock, tmp_path: Path
+) -> None:
+    profile = tmp_path / "profile"
+    scraper = WineSocietyOrderScraperSelenium(
+        "user", "pass", "url", profile_dir=str(profile)
+    )
+    options = mock_chrome.call_args.kwargs["options"]
+    assert f"--user-data-dir={profile}" in options.arguments
+    browser = scraper.driver
+    # The order history shows up instead of the login form
+    browser.find_element.return_value.get_attribute.return_value = None
+    scraper.login()
+    browser.find_element.return_value.send_keys.assert_not_called()
+    browser.get.assert_called_once_with("url")
+    # The saved consent cookie means the banner is not waited for
+    assert scraper._cookies_accepted
+
+    browser.get.reset_mock()
+    browser.find_element.return_value.get_attribute.return_value = (
+        wsos.LOGIN_USERNAME_NAME
+    )
+    scraper.login()
+    browser.find_element.return_value.send_keys.assert_called()
+    assert browser.get.call_args_list[-1].args == (wsos.ORDER_HISTORY_URL,)
+    scraper.close()
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_extract_order_number_accepts_text_or_element(mock_chrome: MagicMock) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    element = MagicMock()
+    element.text = "Order #: 12345"
+    assert scraper.extract_order_number_from_element("Order No: 12345") == "12345"
+    assert scraper.extract_order_number_from_element(element) == "12345"
+    assert scraper.extract_order_number_from_element("") is None
+    scraper.close()
+
+
+ORDER_PAGE_HTML = """
+<html><body>
+  <h2>Order No: 12345</h2>
+  <div class="order-toolbar__row">
+    <div class="order-toolbar__text-column">
+      <h3 class="order-toolbar__text-column-title">Date placed</h3><p> 01/06/2024 </p>
+    </div>
+    <div class="order-toolbar__text-column">
+      <h3 class="order-toolbar__text-column-title">Order total</h3><p>£100.00</p>
+    </div>
+    <button class="btn" onclick="location.href='/receipt?orderNumber=TWSWEB-12345'">
+      Download receipt
+    </button>
+  </div>
+  <div class="order-toolbar__group--pull-right order-toolbar__actions">
+    <button onclick="DownloadWineNotesPdf(); location.href='/notes?orderNumber=TWSWEB-12345'">
+      Wine notes
+    </button>
+  </div>
+  <a href="/product/wine1"><img></a><a href="/product/wine1">Wine 1</a>
+</body></html>
+"""
+
+
+def test_parse_order_page_matches_browser_script_fields() -> None:
+    data = wsos.parse_order_page(ORDER_PAGE_HTML, "https://example.com/order/1")
+    assert data == {
+        "url": "https://example.com/order/1",
+        "order_number": "Order No: 12345",
+        "columns": {"Date placed": "01/06/2024", "Order total": "£100.00"},
+        "receipts": ["https://example.com/receipt?orderNumber=TWSWEB-12345"],
+        "wine_notes": ["https://example.com/notes?orderNumber=TWSWEB-12345"],
+        "wine_links": ["https://example.com/product/wine1"],
+    }
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "scrape_order_batch")
+@patch.object(WineSocietyOrderScraperSelenium, "download_order_pdfs")
+@patch.object(WineSocietyOrderScraperSelenium, "_download_with_session")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_scrape_all_orders_reads_orders_over_http_first(
+    mock_chrome: MagicMock,
+    mock_session_download: MagicMock,
+    mock_downloads: MagicMock,
+    mock_batch: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(wsos, "ORDERS_FILE", str(tmp_path / "orders.jsonl"))
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    scraper._main_driver.execute_script.return_value = orders_page([1, 2])
+
+    def session_download(url: str, dest_path: str) -> bool:
+        wsos.ensure_parent_dir(dest_path)
+        Path(dest_path).write_bytes(b"%PDF-1.4")
+        return True
+
+    def get(url: str, timeout: int) -> MagicMock:
+        resp = MagicMock()
+        resp.url = url
+        # Order 2 needs the browser: the page comes back without the order
+        resp.text = ORDER_PAGE_HTML if url.endswith("/1") else "<html></html>"
+        return resp
+
+    scraper.http = MagicMock()
+    scraper.http.get.side_effect = get
+    mock_session_download.side_effect = session_download
+    mock_batch.side_effect = lambda hrefs: [None] * len(hrefs)
+    orders = list(scraper.scrape_all_orders())
+    assert [o.order_number for o in orders] == ["12345"]
+    assert orders[0].order_date == "01/06/2024"
+    # The receipt saved as the order PDF is copied, not fetched a second time
+    mock_session_download.assert_called_once()
+    receipt = tmp_path / "Data" / "receipts" / "receipt_12345.pdf"
+    assert receipt.read_bytes() == b"%PDF-1.4"
+    mock_downloads.assert_called_once_with(
+        [],
+        ["https://example.com/notes?orderNumber=TWSWEB-12345"],
+        browser_fallback=False,
+    )
+    mock_batch.assert_called_once_with(["https://example.com/order/2"])
+    scraper.close()
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_save_order_page_as_pdf_decodes_inline_base64(
+    mock_chrome: MagicMock, tmp_path: Path
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    # A browser that ignores transferMode returns the whole PDF base64-encoded
+    scraper.driver.execute_cdp_cmd.return_value = {"data": "JVBERi0xLjQ="}
+    output_path = tmp_path / "new_dir" / "12345.pdf"
+    scraper.save_order_page_as_pdf(str(output_path))
+    assert output_path.read_bytes() == b"%PDF-1.4"
+    scraper.driver.execute_cdp_cmd.assert_called_with(
+        "Page.printToPDF", wsos.PRINT_TO_PDF_OPTIONS
+    )
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "save_order_page_as_pdf")
+@patch.object(WineSocietyOrderScraperSelenium, "download_order_pdfs")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_order_page_is_read_again_until_order_number_renders(
+    mock_chrome: MagicMock, mock_downloads: MagicMock, mock_save: MagicMock
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    scraper._cookies_accepted = True
+    scraper.driver.execute_script.side_effect = [
+        {"order_number": None},
+        {"url": "https://example.com/order/7", "order_number": "Order No: 7"},
+    ]
+    result = scraper.handle_order_detail_page(output_dir="/tmp")
+    assert result is not None
+    assert result.order_number == "7"
+    assert scraper.driver.execute_script.call_count == 2
+    scraper.close()
+
+
+def test_parse_order_page_finds_receipts_by_onclick_url() -> None:
+    html = ORDER_PAGE_HTML.replace(
+        "location.href='/receipt?orderNumber=TWSWEB-12345'",
+        "location.href='/CustomFileDownload/DownloadInvoice?orderNumber=TWSWEB-12345'",
+    ).replace(
+        "</button>\n  </div>",
+        '</button>\n    <button class="btn" onclick="location.href=\'/reorder\'">'
+        "Download receipt history</button>\n  </div>",
+        1,
+    )
+    data = wsos.parse_order_page(html, "https://example.com/order/1")
+    # Matched on the download URL, whatever the case or the button's text
+    assert data["receipts"] == [
+        "https://example.com/CustomFileDownload/DownloadInvoice?orderNumber=TWSWEB-12345"
+    ]
+    assert data["wine_notes"] == ["https://example.com/notes?orderNumber=TWSWEB-12345"]
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_trackers_are_blocked_and_list_is_configurable(mock_chrome: MagicMock) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    blocked = scraper.driver.execute_cdp_cmd.call_args_list[-1].args[1]["urls"]
+    assert "*google-analytics.com*" in blocked
+    assert "*.png" in blocked
+    scraper.close()
+
+    mock_chrome.reset_mock()
+    scraper = WineSocietyOrderScraperSelenium(
+        "user", "pass", "url", blocked_urls=["*.png"]
+    )
+    scraper.driver.execute_cdp_cmd.assert_any_call(
+        "Network.setBlockedURLs", {"urls": ["*.png"]}
+    )
+    scraper.close()
+
+
+def test_write_base64_decodes_in_slices() -> None:
+    payload = bytes(range(256)) * 7
+    out = io.BytesIO()
+    writes = MagicMock(side_effect=out.write)
+    wsos.write_base64(
+        MagicMock(write=writes), base64.b64encode(payload).decode(), chunk_size=300
+    )
+    assert out.getvalue() == payload
+    assert writes.call_count == -(-len(payload) // 300)
+
+
+def test_parent_dir_is_created_again_after_removal(tmp_path: Path) -> None:
+    dest_path = str(tmp_path / "receipts" / "receipt_1.pdf")
+    wsos.ensure_parent_dir(dest_path)
+    (tmp_path / "receipts").rmdir()
+    wsos.ensure_parent_dir(dest_path)
+    assert (tmp_path / "receipts").is_dir()
+
+
+def test_order_page_xpaths_are_compiled_once() -> None:
+    wsos.compiled_xpath.cache_clear()
+    for n in range(3):
+        wsos.parse_order_page(ORDER_PAGE_HTML, f"https://example.com/order/{n}")
+    # Each distinct XPath is compiled on the first page only
+    info = wsos.compiled_xpath.cache_info()
+    assert info.misses == info.currsize == 7
+    assert info.hits > info.misses
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_login_waits_reuse_shared_conditions(mock_chrome: MagicMock) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    scraper.driver.get_cookie.return_value = None
+    with patch.object(wsos.WebDriverWait, "until") as until:
+        until.return_value.get_attribute.return_value = None
+        scraper.login()
+        scraper.login()
+    assert [c.args[0] for c in until.call_args_list] == [
+        wsos.LOGIN_FORM_OR_ORDERS_PRESENT,
+        wsos.COOKIE_BANNER_CLICKABLE,
+        wsos.ORDER_VIEWS_PRESENT,
+        # The cookie banner has been accepted by the second login
+        wsos.LOGIN_FORM_OR_ORDERS_PRESENT,
+        wsos.ORDER_VIEWS_PRESENT,
+    ]
+    assert scraper.wait._poll == wsos.WAIT_POLL
+    scraper.close()
+
+
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_page_fetches_several_pdfs_in_one_script(
+    mock_chrome: MagicMock, tmp_path: Path
+) -> None:
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    tasks = [
+        ("https://example.com/receipt", str(tmp_path / "receipt.pdf")),
+        ("https://example.com/notes", str(tmp_path / "notes.pdf")),
+    ]
+    scraper.driver.execute_async_script.return_value = [
+        {"data": "JVBERi0xLjQ="},
+        {"error": "403 text/html"},
+    ]
+    assert scraper._download_with_page_fetches(tasks) == [True, False]
+    scraper.driver.execute_async_script.assert_called_once_with(
+        wsos.FETCH_PDFS_JS, [url for url, _ in tasks]
+    )
+    assert (tmp_path / "receipt.pdf").read_bytes() == b"%PDF-1.4"
+    assert not (tmp_path / "notes.pdf").exists()
+    scraper.close()
+
+
+@patch.object(WineSocietyOrderScraperSelenium, "save_order_page_as_pdf")
+@patch("src.wine_soc_order_scraper_selenium.webdriver.Chrome")
+def test_receipt_saved_as_order_pdf_is_not_downloaded_again(
+    mock_chrome: MagicMock,
+    mock_save: MagicMock,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    receipt_url = "https://example.com/receipt?orderNumber=TWSWEB-12345"
+
+    def get(url: str, timeout: int, stream: bool) -> MagicMock:
+        resp = MagicMock()
+        resp.headers = {"Content-Type": "application/pdf"}
+        resp.raw = io.BytesIO(b"%PDF-1.4")
+        return resp
+
+    scraper = WineSocietyOrderScraperSelenium("user", "pass", "url")
+    scraper._cookies_accepted = True
+    scraper.http = MagicMock()
+    scraper.http.get.side_effect = get
+    scraper.driver.execute_script.return_value = {
+        "url": "https://example.com/order/12345",
+        "order_number": "Order No: 12345",
+        "receipts": [receipt_url],
+    }
+    order = scraper.handle_order_detail_page(output_dir=str(tmp_path / "orders"))
+    assert order is not None
+    assert (tmp_path / "orders" / "12345.pdf").read_bytes() == b"%PDF-1.4"
+    receipt = tmp_path / "Data" / "receipts" / "receipt_12345.pdf"
+    assert receipt.read_bytes() == b"%PDF-1.4"
+    # One GET for the receipt, reused for both files, and no page print
+    scraper.http.get.assert_called_once()
+    mock_save.assert_not_called()
     scraper.close()
@@ -0,0 +1,138 @@
+"""Tests for the pooled receipt download helper."""
+
+import io
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src import wine_soc_receipt_download as wsrd
+
+
+def test_browser_pool_reuses_and_recycles_browsers() -> None:
+    factory = MagicMock(side_effect=lambda: MagicMock())
+    pool = wsrd.BrowserPool(size=2, factory=factory, max_uses=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+    # Worn out after two uses, so a fresh browser takes its place
+    first.quit.assert_called_once()
+    second = pool.acquire()
+    assert second is not first
+    assert factory.call_count == 2
+    pool.release(second)
+    pool.close()
+    second.quit.assert_called_once()
+
+
+def test_download_receipt_uses_pooled_browser(tmp_path: Path) -> None:
+    driver = MagicMock()
+    pool = wsrd.BrowserPool(size=1, factory=lambda: driver)
+    download_dir = tmp_path / "receipts"
+    with patch.object(wsrd, "POOL", pool), patch.object(wsrd, "DOWNLOAD_TIMEOUT", 0):
+        wsrd.download_receipt_pdf_wine_society("TWSWEB-1", str(download_dir))
+        wsrd.download_receipt_pdf_wine_society("TWSWEB-2", str(download_dir))
+    assert driver.get.call_count == 2
+    driver.execute_cdp_cmd.assert_called_with(
+        "Browser.setDownloadBehavior",
+        {"behavior": "allow", "downloadPath": str(download_dir)},
+    )
+    driver.quit.assert_not_called()
+    pool.close()
+
+
+def test_download_receipts_bulk_spreads_orders_over_browsers(tmp_path: Path) -> None:
+    drivers: list[MagicMock] = []
+
+    def factory() -> MagicMock:
+        drivers.append(MagicMock())
+        return drivers[-1]
+
+    pool = wsrd.BrowserPool(size=2, factory=factory)
+    orders = [f"TWSWEB-{n}" for n in range(6)]
+    with patch.object(wsrd, "POOL", pool), patch.object(wsrd, "DOWNLOAD_TIMEOUT", 0):
+        wsrd.download_receipts_bulk(orders, str(tmp_path / "receipts"), workers=4)
+    urls = sorted(c.args[0] for d in drivers for c in d.get.call_args_list)
+    assert urls == sorted(
+        f"https://www.thewinesociety.com/CustomFileDownload/DownloadInvoice"
+        f"?orderNumber={n}"
+        for n in orders
+    )
+    assert 1 <= len(drivers) <= 2
+    pool.close()
+
+
+def test_download_receipt_waits_for_the_pdf(tmp_path: Path) -> None:
+    download_dir = tmp_path / "receipts"
+    driver = MagicMock()
+    # The PDF lands as soon as the receipt URL is loaded
+    driver.get.side_effect = lambda url: (download_dir / "TWSWEB-1.pdf").write_bytes(
+        b"%PDF"
+    )
+    pool = wsrd.BrowserPool(size=1, factory=lambda: driver)
+    with patch.object(wsrd, "POOL", pool), patch.object(wsrd.log, "warning") as warn:
+        wsrd.download_receipt_pdf_wine_society("TWSWEB-1", str(download_dir))
+        warn.assert_not_called()
+        # No new file for a second download of the same receipt
+        driver.get.side_effect = None
+        with patch.object(wsrd, "DOWNLOAD_TIMEOUT", 0):
+            wsrd.download_receipt_pdf_wine_society("TWSWEB-1", str(download_dir))
+        warn.assert_called_once()
+    pool.close()
+
+
+def receipt_response(content_type: str, body: bytes = b"%PDF-1.4") -> MagicMock:
+    resp = MagicMock()
+    resp.__enter__.return_value = resp
+    resp.headers = {"Content-Type": content_type}
+    resp.raw = io.BytesIO(body)
+    return resp
+
+
+def test_session_downloads_receipt_without_a_browser(tmp_path: Path) -> None:
+    driver = MagicMock()
+    driver.get_cookies.return_value = [
+        {"name": "session", "value": "abc", "domain": ".thewinesociety.com"}
+    ]
+    session = wsrd.session_from_driver(driver)
+    assert session.cookies.get("session") == "abc"
+    session.get = MagicMock(
+        side_effect=lambda *args, **kwargs: receipt_response("application/pdf")
+    )
+    factory = MagicMock()
+    with patch.object(wsrd, "POOL", wsrd.BrowserPool(factory=factory)):
+        wsrd.download_receipts_bulk(
+            ["TWSWEB-1", "TWSWEB-2"], str(tmp_path), session=session
+        )
+    assert (tmp_path / "TWSWEB-1.pdf").read_bytes() == b"%PDF-1.4"
+    assert not list(tmp_path.glob("*.part"))
+    factory.assert_not_called()
+
+
+def test_session_download_falls_back_to_browser(tmp_path: Path) -> None:
+    session = MagicMock()
+    # An expired session gets the login page rather than the receipt
+    session.get.return_value = receipt_response("text/html", b"<html>")
+    driver = MagicMock()
+    pool = wsrd.BrowserPool(size=1, factory=lambda: driver)
+    with patch.object(wsrd, "POOL", pool), patch.object(wsrd, "DOWNLOAD_TIMEOUT", 0):
+        wsrd.download_receipt_pdf_wine_society("TWSWEB-1", str(tmp_path), session)
+        wsrd.download_receipt_pdf_wine_society(
+            "TWSWEB-2", str(tmp_path), session, browser_fallback=False
+        )
+    assert not (tmp_path / "TWSWEB-1.pdf").exists()
+    driver.get.assert_called_once()
+    pool.close()
+
+
+def test_failed_session_download_leaves_no_partial_file(tmp_path: Path) -> None:
+    resp = receipt_response("application/pdf")
+    resp.raw = MagicMock()
+    resp.raw.read.side_effect = OSError("connection reset")
+    session = MagicMock()
+    session.get.return_value = resp
+    assert (
+        wsrd.download_receipt_pdf_requests(session, "TWSWEB-1", str(tmp_path)) is None
+    )
+    assert list(tmp_path.iterdir()) == []
+    # Compressed responses are decoded while they are copied
+    assert resp.raw.decode_content is True
@@ -0,0 +1,36 @@
+"""Tests for the requests-based login and order link fetching."""
+
+from unittest.mock import MagicMock
+
+from src import wine_soc_scraper as wss
+
+
+def test_login_posts_hidden_fields() -> None:
+    session = MagicMock()
+    session.get.return_value.text = """
+    <form>
+      <input type="hidden" name="__RequestVerificationToken" value="tok">
+      <input type="hidden" name="ReturnUrl" value="">
+      <input type="text" name="Email" value="ignored">
+    </form>
+    """
+    session.post.return_value.text = "<a>Logout</a>"
+    assert wss.login(session, "me@example.com", "pw")
+    assert session.post.call_args.kwargs["data"] == {
+        "Email": "me@example.com",
+        "Password": "pw",
+        "__RequestVerificationToken": "tok",
+    }
+
+
+def test_fetch_order_links_returns_absolute_urls() -> None:
+    session = MagicMock()
+    session.get.return_value.text = """
+    <a href="/my-account/order-details/1">View</a>
+    <a href="/wine/claret">Claret</a>
+    <a href="https://www.thewinesociety.com/my-account/order-details/2">View</a>
+    """
+    assert wss.fetch_order_links(session) == [
+        "https://www.thewinesociety.com/my-account/order-details/1",
+        "https://www.thewinesociety.com/my-account/order-details/2",
+    ]